@@ -2,12 +2,17 @@
 
 import logging
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from api.schemas import SearchQuery, SearchResponse
 from scraper.service import ScraperService, get_scraper_service
 
 router = APIRouter(prefix="/search", tags=["search"])
 logger = logging.getLogger(__name__)
 
+# Hoisted so the handler does no per-request list building or joining
+_SUPPORTED_SITES = frozenset({"alza"})
+_SUPPORTED_DETAIL = "Supported sites: " + ", ".join(sorted(_SUPPORTED_SITES))
+
 
 @router.post(
     "",
@@ -42,29 +47,33 @@ async def search_products(
         )
     
     # Validate supported sites
-    supported_sites = ["alza"]
-    if search_query.site.lower() not in supported_sites:
+    site = search_query.site.lower()
+    if site not in _SUPPORTED_SITES:
         raise HTTPException(
             status_code=400,
-            detail=f"Site '{search_query.site}' is not supported. Supported sites: {', '.join(supported_sites)}"
+            detail=f"Site '{search_query.site}' is not supported. {_SUPPORTED_DETAIL}"
         )
-    
+
     try:
-        logger.info(f"Searching {search_query.site} for: {sanitized_query}")
-        
+        logger.info(f"Searching {site} for: {sanitized_query}")
+
         results = await scraper.search_site(
-            site=search_query.site.lower(),
+            site=site,
             query=sanitized_query,
             limit=10
         )
-        
+
         logger.info(f"Found {len(results)} results for query: {sanitized_query}")
-        
-        return SearchResponse(
+
+        # The scraper already returns validated SearchResultItem objects, so
+        # model_construct plus a direct ORJSONResponse skips the second
+        # validation pass FastAPI would run against response_model
+        response = SearchResponse.model_construct(
             query=sanitized_query,
-            site=search_query.site.lower(),
+            site=site,
             results=results
         )
+        return ORJSONResponse(response.model_dump(mode="json"))
     except ValueError as e:
         # User-friendly error messages from the scraper service
         logger.warning(f"Search validation error: {str(e)}")
@@ -1,18 +1,46 @@
 """Track endpoint for product price tracking."""
 
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from urllib.parse import urlsplit
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload
 
-from api.schemas import ProductCreate, ProductOut, PriceHistoryOut, AlertCreate, AlertResponse
+from api.schemas import (
+    PRODUCT_OUT_ADAPTER,
+    PRODUCT_OUT_LIST_ADAPTER,
+    ProductCreate,
+    ProductOut,
+    PriceHistoryOut,
+    AlertCreate,
+    AlertResponse,
+)
 from db import get_db
 from db.models import Product, PriceHistory
 from scraper.service import ScraperService, get_scraper_service
 
 router = APIRouter(prefix="/track", tags=["tracking"])
 
+# Short-TTL response cache for the hot read endpoints. Prices only change
+# on the scheduler interval, so dashboards polling every few seconds can
+# be served from memory. Mutating endpoints invalidate the affected keys.
+# Serialized dicts are cached (never ORM objects) to avoid touching a
+# closed session.
+_product_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_LIST_CACHE_KEY = "__list__"
+
+# Known e-shop hosts; eshop detection is an O(1) lookup on the parsed
+# hostname rather than a substring scan over the whole URL
+_HOST_ESHOP = {
+    "alza.cz": "alza",
+    "www.alza.cz": "alza",
+}
+
 
 @router.post(
     "",
@@ -40,21 +68,13 @@ async def track_product(
     Raises:
         HTTPException: If product already exists or fetching fails
     """
-    # Check if product already exists
-    result = await db.execute(
-        select(Product).where(Product.url == product_data.url)
-    )
-    existing_product = result.scalar_one_or_none()
-    
-    if existing_product:
-        raise HTTPException(
-            status_code=400,
-            detail=f"This product is already being tracked. You can view it in your dashboard."
-        )
-    
+    # HttpUrl already validated the structure in pydantic-core; downstream
+    # consumers want the plain string
+    url = str(product_data.url)
+
     # Fetch product details
     try:
-        details = await scraper.fetch_product_details(product_data.url)
+        details = await scraper.fetch_product_details(url)
     except ValueError as e:
         # User-friendly error from scraper
         raise HTTPException(status_code=400, detail=str(e))
@@ -63,41 +83,72 @@ async def track_product(
             status_code=500,
             detail=f"Unable to fetch product information. Please verify the URL is correct and try again. Error: {str(e)}"
         )
-    
-    # Determine e-shop from URL
-    eshop = "unknown"
-    if "alza.cz" in product_data.url:
-        eshop = "alza"
-    
-    # Create new product
-    new_product = Product(
-        url=product_data.url,
-        name=details["name"],
-        eshop=eshop,
-        last_known_price=details["price"],
-        last_check_time=datetime.now(timezone.utc),
-        is_tracked=True,
-        is_on_sale=details.get("is_on_sale", False),
-        original_price=details.get("original_price")
+
+    # Determine e-shop from the URL's hostname
+    host = urlsplit(url).hostname or ""
+    eshop = _HOST_ESHOP.get(host.lower(), "unknown")
+
+    # One timestamp for both rows keeps the product and its first history
+    # entry consistent
+    now = datetime.now(timezone.utc)
+
+    # Optimistic insert: a single INSERT ... ON CONFLICT DO NOTHING replaces
+    # the old SELECT-then-INSERT pair and closes the race where two
+    # concurrent posters both pass the duplicate check
+    insert_fn = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = (
+        insert_fn(Product)
+        .values(
+            url=url,
+            name=details["name"],
+            eshop=eshop,
+            last_known_price=details["price"],
+            last_check_time=now,
+            is_tracked=True,
+            is_on_sale=details.get("is_on_sale", False),
+            original_price=details.get("original_price")
+        )
+        .on_conflict_do_nothing(index_elements=["url"])
+        .returning(Product.id)
     )
-    
-    db.add(new_product)
-    await db.flush()  # Get the product ID
-    
+    product_id = (await db.execute(stmt)).scalar_one_or_none()
+
+    if product_id is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"This product is already being tracked. You can view it in your dashboard."
+        )
+
     # Create initial price history entry
     price_entry = PriceHistory(
-        product_id=new_product.id,
+        product_id=product_id,
         price=details["price"],
-        timestamp=datetime.now(timezone.utc),
+        timestamp=now,
         is_on_sale=details.get("is_on_sale", False),
         original_price=details.get("original_price")
     )
     db.add(price_entry)
-    
+
     await db.commit()
-    await db.refresh(new_product)
-    
-    return new_product
+
+    _product_cache.pop(_LIST_CACHE_KEY, None)
+
+    # Everything needed for the response is already in hand - no need to
+    # re-read the row we just wrote
+    return ProductOut(
+        id=product_id,
+        url=url,
+        name=details["name"],
+        eshop=eshop,
+        last_known_price=details["price"],
+        last_check_time=now,
+        is_tracked=True,
+        is_on_sale=details.get("is_on_sale", False),
+        original_price=details.get("original_price"),
+        alert_price=None,
+        alert_triggered=False
+    )
 
 
 @router.get(
@@ -108,6 +159,9 @@ async def track_product(
 )
 async def get_product_history(
     product_id: int,
+    limit: int = Query(500, ge=1, le=5000, description="Maximum number of history entries to return"),
+    offset: int = Query(0, ge=0, description="Number of history entries to skip"),
+    since: datetime | None = Query(None, description="Only return entries recorded at or after this time"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -115,6 +169,9 @@ async def get_product_history(
     
     Args:
         product_id: Product ID
+        limit: Maximum number of entries to return (server-capped)
+        offset: Number of entries to skip for pagination
+        since: Optional lower bound on the entry timestamp
         db: Database session
         
     Returns:
@@ -123,28 +180,31 @@ async def get_product_history(
     Raises:
         HTTPException: If product not found
     """
-    # Get product with price history
+    # Cheap existence check - no need to load the full product row
     result = await db.execute(
-        select(Product)
-        .where(Product.id == product_id)
-        .options(selectinload(Product.price_history))
+        select(Product.id).where(Product.id == product_id)
     )
-    product = result.scalar_one_or_none()
-    
-    if not product:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=404,
             detail=f"Product with ID {product_id} not found. Unable to retrieve price history."
         )
-    
-    # Sort price history by timestamp (newest first)
-    history = sorted(
-        product.price_history,
-        key=lambda x: x.timestamp,
-        reverse=True
+
+    # Let the DB return history pre-sorted (newest first) via the
+    # (product_id, timestamp) index instead of sorting in Python, and keep
+    # the response bounded regardless of how much history has accumulated
+    stmt = (
+        select(PriceHistory)
+        .where(PriceHistory.product_id == product_id)
+        .order_by(PriceHistory.timestamp.desc())
+        .limit(limit)
+        .offset(offset)
     )
-    
-    return history
+    if since is not None:
+        stmt = stmt.where(PriceHistory.timestamp >= since)
+
+    result = await db.execute(stmt)
+    return result.scalars().all()
 
 
 @router.get(
@@ -165,11 +225,19 @@ async def get_tracked_products(
     Returns:
         list[ProductOut]: List of all tracked products
     """
+    cached = _product_cache.get(_LIST_CACHE_KEY)
+    if cached is not None:
+        return JSONResponse(cached)
+
     result = await db.execute(
-        select(Product).where(Product.is_tracked == True)
+        select(Product).where(Product.is_tracked == True).options(raiseload("*"))
     )
     products = result.scalars().all()
-    return products
+
+    validated = PRODUCT_OUT_LIST_ADAPTER.validate_python(products, from_attributes=True)
+    payload = PRODUCT_OUT_LIST_ADAPTER.dump_python(validated, mode="json")
+    _product_cache[_LIST_CACHE_KEY] = payload
+    return JSONResponse(payload)
 
 
 @router.get(
@@ -195,18 +263,24 @@ async def get_product(
     Raises:
         HTTPException: If product not found
     """
+    cached = _product_cache.get(product_id)
+    if cached is not None:
+        return cached
+
     result = await db.execute(
-        select(Product).where(Product.id == product_id)
+        select(Product).where(Product.id == product_id).options(raiseload("*"))
     )
     product = result.scalar_one_or_none()
-    
+
     if not product:
         raise HTTPException(
             status_code=404,
             detail=f"Product with ID {product_id} not found in your tracked products."
         )
-    
-    return product
+
+    payload = PRODUCT_OUT_ADAPTER.validate_python(product).model_dump()
+    _product_cache[product_id] = payload
+    return payload
 
 
 @router.put(
@@ -234,25 +308,27 @@ async def set_price_alert(
     Raises:
         HTTPException: If product not found
     """
+    # Single UPDATE ... RETURNING replaces the load-then-mutate pair; the
+    # alert_triggered flag resets whenever a new alert is set
     result = await db.execute(
-        select(Product).where(Product.id == product_id)
+        update(Product)
+        .where(Product.id == product_id)
+        .values(alert_price=alert_data.target_price, alert_triggered=False)
+        .returning(Product)
     )
     product = result.scalar_one_or_none()
-    
+
     if not product:
         raise HTTPException(
             status_code=404,
             detail=f"Product with ID {product_id} not found. Unable to set price alert."
         )
-    
-    # Update alert settings
-    product.alert_price = alert_data.target_price
-    # Reset alert triggered flag when setting a new alert
-    product.alert_triggered = False
-    
+
     await db.commit()
-    await db.refresh(product)
-    
+
+    _product_cache.pop(product_id, None)
+    _product_cache.pop(_LIST_CACHE_KEY, None)
+
     return AlertResponse(
         status="success",
         item=product
@@ -282,20 +358,21 @@ async def clear_price_alert(
         HTTPException: If product not found
     """
     result = await db.execute(
-        select(Product).where(Product.id == product_id)
+        update(Product)
+        .where(Product.id == product_id)
+        .values(alert_price=None, alert_triggered=False)
+        .returning(Product.id)
     )
-    product = result.scalar_one_or_none()
-    
-    if not product:
+
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=404,
             detail=f"Product with ID {product_id} not found. Unable to clear price alert."
         )
-    
-    # Clear alert settings
-    product.alert_price = None
-    product.alert_triggered = False
-    
+
     await db.commit()
-    
+
+    _product_cache.pop(product_id, None)
+    _product_cache.pop(_LIST_CACHE_KEY, None)
+
     return {"status": "success"}
@@ -1,18 +1,17 @@
 """Pydantic schemas for API request/response validation."""
 
 from datetime import datetime
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, TypeAdapter
 from typing import Optional
 
 
 # Product Schemas
 class ProductBase(BaseModel):
     """Base product schema."""
-    url: str = Field(
+    url: HttpUrl = Field(
         ...,
         description="The URL of the product page",
         examples=["https://www.alza.cz/samsung-galaxy-s23-d7654321.htm"],
-        min_length=10,
         max_length=2048
     )
 
@@ -53,7 +52,7 @@ class ProductOut(BaseModel):
     )
     alert_triggered: bool = Field(default=False, description="Whether price alert has been triggered")
     
-    model_config = {"from_attributes": True}
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Price History Schemas
@@ -71,7 +70,7 @@ class PriceHistoryOut(BaseModel):
         examples=[15999.00]
     )
     
-    model_config = {"from_attributes": True}
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Search Schemas
@@ -146,3 +145,9 @@ class AlertResponse(BaseModel):
     
     status: str = Field(..., description="Status of the operation", examples=["success"])
     item: ProductOut = Field(..., description="Updated product with alert information")
+
+
+# Prebuilt adapters so endpoints can validate/serialize ORM rows in a
+# single batch pass instead of paying per-call schema construction
+PRODUCT_OUT_ADAPTER: TypeAdapter = TypeAdapter(ProductOut)
+PRODUCT_OUT_LIST_ADAPTER: TypeAdapter = TypeAdapter(list[ProductOut])
@@ -8,12 +8,19 @@ class Settings(BaseSettings):
     
     # Database Configuration
     database_url: str = "sqlite+aiosqlite:///./pricescout.db"
+    db_pool_size: int = 20  # Connection pool size (ignored for SQLite)
+    db_max_overflow: int = 10  # Extra connections allowed beyond the pool
+    db_pool_pre_ping: bool = True  # Validate connections before checkout
     
     # API Configuration
     api_title: str = "PriceScout API"
     api_version: str = "1.0.0"
     api_description: str = "E-commerce product search and price tracking API"
     
+    # CORS Configuration: explicit origins let the middleware take its
+    # precompiled path; the "*" default keeps development frictionless
+    cors_allowed_origins: tuple[str, ...] = ("*",)
+    
     # Scheduler Configuration
     price_check_interval_hours: int = 4
     
@@ -21,6 +28,13 @@ class Settings(BaseSettings):
     scraper_timeout: int = 30000
     scraper_headless: bool = True
     scraper_mock_mode: bool = False  # Enable mock data when scraping fails
+    scraper_concurrency: int = 10  # Max concurrent fetches in the price check job
+    scraper_max_concurrency: int = 100  # HTTP connection pool ceiling
+    scraper_keepalive_connections: int = 20  # Idle connections kept for reuse
+    scraper_keepalive_expiry: int = 60  # Seconds an idle connection stays pooled
+    scraper_request_concurrency: int = 64  # In-flight request cap on the shared client
+    scraper_batch_size: int = 8  # Max scrape calls dispatched per batch
+    scraper_batch_window_ms: int = 20  # How long the batcher waits to fill a batch
     
     model_config = SettingsConfigDict(
         env_file=".env",
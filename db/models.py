@@ -1,7 +1,7 @@
 """Database models for PriceScout API."""
 
 from datetime import datetime, timezone
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Index
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Index, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from typing import Optional, List
 
@@ -21,8 +21,8 @@ class Product(Base):
     name: Mapped[str] = mapped_column(String, nullable=False)
     eshop: Mapped[str] = mapped_column(String, nullable=False, index=True)
     last_known_price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    last_check_time: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
-    is_tracked: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
+    last_check_time: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), server_default=func.now(), index=True)
+    is_tracked: Mapped[bool] = mapped_column(Boolean, default=True)
     
     # Sale tracking fields
     is_on_sale: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
@@ -32,6 +32,11 @@ class Product(Base):
     alert_price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     alert_triggered: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
     
+    # Conditional GET validators from the last fetch; lets the scraper send
+    # If-None-Match / If-Modified-Since and skip parsing on 304
+    etag: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    last_modified: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    
     # Relationship to price history
     price_history: Mapped[List["PriceHistory"]] = relationship(
         "PriceHistory",
@@ -43,6 +48,12 @@ class Product(Base):
     __table_args__ = (
         Index('ix_products_tracked_sale', 'is_tracked', 'is_on_sale'),
         Index('ix_products_tracked_alert', 'is_tracked', 'alert_triggered'),
+        # Covering index for the tracked-products sweep; the INCLUDE columns
+        # let Postgres answer the list query without heap fetches
+        Index(
+            'ix_products_tracked_id', 'is_tracked', 'id',
+            postgresql_include=['name', 'eshop', 'last_known_price', 'last_check_time']
+        ),
     )
 
 
@@ -54,7 +65,7 @@ class PriceHistory(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     product_id: Mapped[int] = mapped_column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     price: Mapped[float] = mapped_column(Float, nullable=False)
-    timestamp: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    timestamp: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), server_default=func.now())
     
     # Sale tracking fields
     is_on_sale: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -62,3 +73,8 @@ class PriceHistory(Base):
     
     # Relationship to product
     product: Mapped["Product"] = relationship("Product", back_populates="price_history")
+
+    # Composite index so per-product history reads come back pre-sorted
+    __table_args__ = (
+        Index('ix_price_history_product_ts', 'product_id', 'timestamp'),
+    )
@@ -4,11 +4,22 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from core.config import settings
 from db.models import Base
 
+# Pool tuning only applies to real client/server databases; SQLite's
+# driver uses its own pooling and rejects these arguments
+_pool_kwargs = {}
+if not settings.database_url.startswith("sqlite"):
+    _pool_kwargs = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
     echo=False,
-    future=True
+    future=True,
+    **_pool_kwargs
 )
 
 # Create async session factory
@@ -1,18 +1,26 @@
 """Main FastAPI application for PriceScout API."""
 
+import fcntl
+import hashlib
 import logging
+import mimetypes
+import re
+
+import orjson
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from email.utils import formatdate
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from pathlib import Path
+from starlette.routing import Route
 
 from core.config import settings
 from db import init_db
 from api.endpoints import search_router, track_router
 from scheduler.jobs import check_all_product_prices
+from scraper.service import get_scraper_service
 
 # Configure logging
 logging.basicConfig(
@@ -24,6 +32,108 @@ logger = logging.getLogger(__name__)
 # Initialize scheduler
 scheduler = AsyncIOScheduler()
 
+# When uvicorn runs with multiple workers, every worker executes the
+# lifespan. Only the worker holding this advisory lock starts the
+# scheduler, so the price check runs once per host instead of once per
+# worker. The file handle must stay open for the lock to be held.
+_SCHEDULER_LOCK_PATH = Path(__file__).parent / ".scheduler.lock"
+_scheduler_lock_file = None
+
+
+# Frontend files never change at runtime, so they are read once into
+# memory with precomputed ETag/Last-Modified headers instead of paying
+# stat/open/read syscalls on every request
+_static_cache: dict[str, tuple[bytes, str, str, str]] = {}
+
+# Content-hashed filenames (e.g. app.3f9d2c1a.js) never change, so clients
+# may cache them forever; everything else gets a short TTL and relies on
+# ETag revalidation
+_HASHED_ASSET_RE = re.compile(r"\.[0-9a-f]{8,}\.(?:js|css|woff2?|png|jpg|svg)$")
+_CACHE_CONTROL_IMMUTABLE = "public, max-age=31536000, immutable"
+_CACHE_CONTROL_REVALIDATE = "public, max-age=300, must-revalidate"
+
+
+def _cache_static_file(key: str, path: Path, media_type: str) -> None:
+    """Read a static file into the in-memory cache with its headers."""
+    data = path.read_bytes()
+    etag = f'"{hashlib.md5(data).hexdigest()}"'
+    last_modified = formatdate(path.stat().st_mtime, usegmt=True)
+    _static_cache[key] = (data, etag, media_type, last_modified)
+
+
+def _load_static_cache() -> None:
+    """Populate the static cache for the frontend entry points."""
+    base = Path(__file__).parent
+    index_file = base / "frontend" / "index.html"
+    # Bare text/* types: Starlette's Response appends the charset itself,
+    # so embedding one here would double it in the Content-Type header
+    if index_file.exists():
+        _cache_static_file("index", index_file, "text/html")
+    tokens_file = base / "design-tokens.css"
+    if tokens_file.exists():
+        _cache_static_file("tokens", tokens_file, "text/css")
+
+    # Manifest for the whole frontend bundle: the file list is fixed at
+    # deploy time, so /static lookups become one dict access instead of
+    # Starlette's per-request stat + open + MIME detection
+    frontend_dir = base / "frontend"
+    if frontend_dir.exists():
+        for file_path in frontend_dir.rglob("*"):
+            if file_path.is_file():
+                rel = file_path.relative_to(frontend_dir).as_posix()
+                media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+                _cache_static_file(rel, file_path, media_type)
+
+
+# Eager load at import so request handlers are a dict lookup with no
+# filesystem calls; the lazy reload in the handlers only covers the case
+# where the cache never got populated
+_load_static_cache()
+
+
+def _static_response(request: Request, key: str) -> Response:
+    """Serve a cached static file, honoring If-None-Match with a 304."""
+    data, etag, media_type, last_modified = _static_cache[key]
+    if _HASHED_ASSET_RE.search(key):
+        cache_control = _CACHE_CONTROL_IMMUTABLE
+    else:
+        cache_control = _CACHE_CONTROL_REVALIDATE
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Last-Modified": last_modified
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type=media_type, headers=headers)
+
+
+def _release_scheduler_lock() -> None:
+    """Release the cross-process scheduler lock if this worker holds it."""
+    global _scheduler_lock_file
+    if _scheduler_lock_file is None:
+        return
+    try:
+        fcntl.flock(_scheduler_lock_file, fcntl.LOCK_UN)
+    except OSError:
+        pass
+    _scheduler_lock_file.close()
+    _scheduler_lock_file = None
+
+
+def _acquire_scheduler_lock() -> bool:
+    """Try to take the cross-process scheduler lock. Non-blocking."""
+    global _scheduler_lock_file
+    try:
+        _scheduler_lock_file = open(_SCHEDULER_LOCK_PATH, "w")
+        fcntl.flock(_scheduler_lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        if _scheduler_lock_file is not None:
+            _scheduler_lock_file.close()
+            _scheduler_lock_file = None
+        return False
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -42,31 +152,56 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
-    
-    # Start background scheduler
+
+    # Warm up the shared scraper service so every request (and the
+    # scheduler) reuses one HTTP client with pooled connections
     try:
-        scheduler.add_job(
-            check_all_product_prices,
-            "interval",
-            hours=settings.price_check_interval_hours,
-            id="check_prices",
-            replace_existing=True
-        )
-        scheduler.start()
-        logger.info(f"Scheduler started (checking prices every {settings.price_check_interval_hours} hours)")
+        app.state.scraper = await get_scraper_service()
+        logger.info("Scraper service initialized successfully")
     except Exception as e:
-        logger.error(f"Failed to start scheduler: {e}")
+        logger.error(f"Failed to initialize scraper service: {e}")
         raise
+
+    # Start background scheduler in exactly one worker
+    if _acquire_scheduler_lock():
+        try:
+            scheduler.add_job(
+                check_all_product_prices,
+                "interval",
+                hours=settings.price_check_interval_hours,
+                id="check_prices",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=600
+            )
+            scheduler.start()
+            logger.info(f"Scheduler started (checking prices every {settings.price_check_interval_hours} hours)")
+        except Exception as e:
+            logger.error(f"Failed to start scheduler: {e}")
+            raise
+    else:
+        logger.info("Scheduler lock held by another worker; skipping scheduler start")
     
     yield
     
     # Shutdown
     logger.info("Shutting down PriceScout API...")
+    if scheduler.running:
+        try:
+            scheduler.shutdown()
+            logger.info("Scheduler stopped successfully")
+        except Exception as e:
+            logger.error(f"Error stopping scheduler: {e}")
+    # Hand the lock back so a later lifespan (or another worker) can
+    # start the scheduler again
+    _release_scheduler_lock()
+
     try:
-        scheduler.shutdown()
-        logger.info("Scheduler stopped successfully")
+        await app.state.scraper.close()
+        logger.info("Scraper service closed successfully")
     except Exception as e:
-        logger.error(f"Error stopping scheduler: {e}")
+        logger.error(f"Error closing scraper service: {e}")
 
 
 # Create FastAPI app
@@ -74,14 +209,18 @@ app = FastAPI(
     title=settings.api_title,
     version=settings.api_version,
     description=settings.api_description,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Configure CORS
+# Configure CORS. With the wildcard origin, credentials are disabled so
+# Starlette can short-circuit with a static Access-Control-Allow-Origin
+# header instead of echoing the request Origin on every response.
+_cors_wildcard = "*" in settings.cors_allowed_origins
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for development
-    allow_credentials=True,
+    allow_origins=list(settings.cors_allowed_origins),
+    allow_credentials=not _cors_wildcard,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -90,60 +229,92 @@ app.add_middleware(
 app.include_router(search_router)
 app.include_router(track_router)
 
-# Mount static files
-frontend_path = Path(__file__).parent / "frontend"
-if frontend_path.exists():
-    app.mount("/static", StaticFiles(directory=str(frontend_path)), name="static")
+@app.get("/static/{path:path}", tags=["static"])
+async def static_asset(path: str, request: Request):
+    """
+    Serve a frontend asset from the in-memory manifest.
+
+    Returns:
+        Response: Asset bytes with ETag/Cache-Control headers
+
+    Raises:
+        HTTPException: If the asset is not in the manifest
+    """
+    # Only reload when the cache was never populated (e.g. tests that
+    # skip the lifespan); reloading on every unknown path would let 404
+    # probes re-read and re-hash the whole frontend tree per request
+    if not _static_cache:
+        _load_static_cache()
+    if path not in _static_cache:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return _static_response(request, path)
 
 
-@app.get("/", tags=["root"])
-async def root():
+async def root(request: Request) -> Response:
     """
-    Root endpoint - serves the frontend UI.
+    Root endpoint - serves the frontend UI from the in-memory cache.
     
     Returns:
-        FileResponse: Frontend HTML page
+        Response: Frontend HTML page with ETag/Cache-Control headers
     """
-    frontend_file = Path(__file__).parent / "frontend" / "index.html"
-    if frontend_file.exists():
-        return FileResponse(frontend_file)
+    if "index" not in _static_cache:
+        # Lazy load covers clients that skip the lifespan (e.g. tests)
+        _load_static_cache()
+    if "index" in _static_cache:
+        return _static_response(request, "index")
     
-    return {
+    return ORJSONResponse({
         "message": "Welcome to PriceScout API",
         "version": settings.api_version,
         "docs_url": "/docs",
         "redoc_url": "/redoc",
         "ui_url": "/static/index.html"
-    }
+    })
 
 
-@app.get("/design-tokens.css", tags=["static"])
-async def design_tokens():
+async def design_tokens(request: Request) -> Response:
     """
-    Serve design tokens CSS file.
+    Serve design tokens CSS from the in-memory cache.
     
     Returns:
-        FileResponse: Design tokens CSS
+        Response: Design tokens CSS with ETag/Cache-Control headers
     """
-    tokens_file = Path(__file__).parent / "design-tokens.css"
-    if tokens_file.exists():
-        return FileResponse(tokens_file, media_type="text/css")
-    return {"error": "Design tokens not found"}
+    if "tokens" not in _static_cache:
+        _load_static_cache()
+    if "tokens" in _static_cache:
+        return _static_response(request, "tokens")
+    return ORJSONResponse({"error": "Design tokens not found"}, status_code=404)
+
+
+# Everything in the health payload except scheduler_running is fixed at
+# startup, so the JSON is prebaked and only the boolean is appended per
+# probe hit
+_HEALTH_PREFIX = orjson.dumps({
+    "status": "healthy",
+    "version": settings.api_version,
+    "price_check_interval_hours": settings.price_check_interval_hours
+})[:-1]
 
 
-@app.get("/health", tags=["health"])
-async def health_check():
+async def health_check(request: Request) -> Response:
     """
     Health check endpoint with detailed status.
     
     Returns:
-        dict: Health status including scheduler state
+        Response: Health status including scheduler state
     """
-    scheduler_running = scheduler.running
-    
-    return {
-        "status": "healthy",
-        "version": settings.api_version,
-        "scheduler_running": scheduler_running,
-        "price_check_interval_hours": settings.price_check_interval_hours
-    }
+    running = b"true" if scheduler.running else b"false"
+    return Response(
+        _HEALTH_PREFIX + b',"scheduler_running":' + running + b"}",
+        media_type="application/json"
+    )
+
+
+# These handlers take no validated inputs and return prebuilt responses,
+# so they are registered as raw Starlette routes to skip FastAPI's
+# dependency/serialization pipeline on the hottest paths
+app.router.routes[:0] = [
+    Route("/", endpoint=root, methods=["GET"]),
+    Route("/design-tokens.css", endpoint=design_tokens, methods=["GET"]),
+    Route("/health", endpoint=health_check, methods=["GET"]),
+]
@@ -1,8 +1,10 @@
 """Background jobs for scheduled tasks."""
 
+import asyncio
 import logging
 from datetime import datetime, timezone
-from sqlalchemy import select
+from sqlalchemy import and_, bindparam, case, literal, select, update
+from core.config import settings
 from db import AsyncSessionLocal
 from db.models import Product, PriceHistory
 from scraper.service import get_scraper_service
@@ -10,96 +12,199 @@ from scraper.service import get_scraper_service
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Keyset page size; bounds how many Product rows are held in memory at once
+_PRODUCT_BATCH_SIZE = 500
+
+
+async def _tracked_batches(db, batch_size=_PRODUCT_BATCH_SIZE):
+    """
+    Yield tracked products in keyset-paginated batches.
+
+    Walks the products table by descending id (WHERE id < last_seen), so
+    memory stays bounded no matter how many products are tracked and no
+    OFFSET scans are involved. Yields plain column tuples rather than ORM
+    objects - the job only reads a handful of fields, so skipping
+    hydration and attribute tracking keeps the rows cheap.
+    """
+    last_id = None
+    while True:
+        query = select(
+            Product.id,
+            Product.url,
+            Product.name,
+            Product.last_known_price,
+            Product.alert_price,
+            Product.alert_triggered,
+            Product.etag,
+            Product.last_modified
+        ).where(Product.is_tracked.is_(True))
+        if last_id is not None:
+            query = query.where(Product.id < last_id)
+        query = query.order_by(Product.id.desc()).limit(batch_size)
+        rows = (await db.execute(query)).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
 
 async def check_all_product_prices():
     """
     Background job to check prices for all tracked products.
-    
+
     This function:
-    1. Gets all products where is_tracked=True
-    2. Fetches current price for each product
+    1. Streams tracked products in keyset-paginated batches
+    2. Fetches current prices concurrently (bounded by scraper_concurrency)
     3. Compares with last_known_price
-    4. If different, creates new PriceHistory entry and updates product
+    4. Applies each batch's updates and new PriceHistory rows as bulk
+       executemany statements, committing per batch
     5. Checks and triggers price alerts when conditions are met
     """
     async with AsyncSessionLocal() as db:
         try:
-            # Get all tracked products
-            result = await db.execute(
-                select(Product).where(Product.is_tracked == True)
-            )
-            products = result.scalars().all()
-            
-            if not products:
+            # Cheap EXISTS probe so an idle deployment exits after one tiny
+            # query instead of running the whole paginated sweep
+            exists_q = select(literal(1)).where(Product.is_tracked.is_(True)).limit(1)
+            if (await db.execute(exists_q)).scalar() is None:
                 logger.info("No products to check")
                 return
-            
-            logger.info(f"Checking prices for {len(products)} products")
-            
+
             # Get scraper service
             scraper = await get_scraper_service()
-            
+
+            # One clock read per run; every row written by this job shares
+            # the same batch timestamp
+            now = datetime.now(timezone.utc)
+
             checked_count = 0
             updated_count = 0
             alert_count = 0
             error_count = 0
-            
-            for product in products:
-                try:
-                    logger.debug(f"Checking price for: {product.name} ({product.url})")
-                    
-                    # Fetch current product details
-                    details = await scraper.fetch_product_details(product.url)
+
+            # The semaphore caps outbound load so a large catalog doesn't
+            # open hundreds of connections at once
+            sem = asyncio.Semaphore(settings.scraper_concurrency)
+
+            async def fetch_one(p):
+                async with sem:
+                    try:
+                        return p, await scraper.fetch_product_details(
+                            p.url, etag=p.etag, last_modified=p.last_modified
+                        )
+                    except Exception as e:
+                        return p, e
+
+            # Core-level table update so each batch's params run as one
+            # executemany instead of the ORM's per-primary-key path
+            products_table = Product.__table__
+            # The alert decision lives in a SQL CASE so the statement works
+            # from the row's own current state: trigger when an alert is set,
+            # not yet fired, and the new price is at or below the target
+            alert_case = case(
+                (
+                    and_(
+                        products_table.c.alert_price.isnot(None),
+                        products_table.c.alert_triggered.is_(False),
+                        products_table.c.alert_price >= bindparam("p")
+                    ),
+                    True
+                ),
+                else_=products_table.c.alert_triggered
+            )
+            update_stmt = (
+                products_table.update()
+                .where(products_table.c.id == bindparam("_id"))
+                .values(
+                    last_known_price=bindparam("p"),
+                    last_check_time=bindparam("t"),
+                    is_on_sale=bindparam("s"),
+                    original_price=bindparam("op"),
+                    alert_triggered=alert_case,
+                    etag=bindparam("e"),
+                    last_modified=bindparam("lm")
+                )
+            )
+
+            async for products in _tracked_batches(db):
+                logger.info(f"Checking prices for batch of {len(products)} products")
+
+                # Fetch the whole batch concurrently; runtime is roughly the
+                # slowest fetch instead of the sum of all of them
+                results = await asyncio.gather(*(fetch_one(p) for p in products))
+
+                # Collect all writes first, then push them as two
+                # executemany statements (one UPDATE, one INSERT)
+                product_updates = []
+                touched_ids = []
+                history_rows = []
+
+                for product, details in results:
+                    if isinstance(details, Exception):
+                        logger.error(f"Error checking product {product.id} ({product.name}): {str(details)}", exc_info=details)
+                        error_count += 1
+                        continue
+
+                    if details.get("unchanged"):
+                        # Conditional GET hit: page body never arrived, so
+                        # price and sale state are known to be the same
+                        logger.debug(f"Page unchanged for '{product.name}'; skipping parse")
+                        touched_ids.append(product.id)
+                        checked_count += 1
+                        continue
+
                     current_price = details["price"]
                     is_on_sale = details.get("is_on_sale", False)
                     original_price = details.get("original_price")
-                    
-                    # Update last check time
-                    product.last_check_time = datetime.now(timezone.utc)
-                    
-                    # Update sale status
-                    product.is_on_sale = is_on_sale
-                    product.original_price = original_price
-                    
-                    # Check if price has changed
+
                     if product.last_known_price != current_price:
-                        logger.info(f"Price changed for '{product.name}': {product.last_known_price} -> {current_price}")
-                        
-                        # Create new price history entry
-                        price_entry = PriceHistory(
-                            product_id=product.id,
-                            price=current_price,
-                            timestamp=datetime.now(timezone.utc),
-                            is_on_sale=is_on_sale,
-                            original_price=original_price
-                        )
-                        db.add(price_entry)
-                        
-                        # Update product's last known price
-                        product.last_known_price = current_price
+                        logger.debug(f"Price changed for '{product.name}': {product.last_known_price} -> {current_price}")
+                        history_rows.append({
+                            "product_id": product.id,
+                            "price": current_price,
+                            "timestamp": now,
+                            "is_on_sale": is_on_sale,
+                            "original_price": original_price
+                        })
                         updated_count += 1
                     else:
                         logger.debug(f"Price unchanged for '{product.name}': {current_price}")
-                    
-                    # Check if price alert should be triggered
+
+                    # The CASE in the UPDATE makes the trigger decision;
+                    # this mirror of it is only for counting and logging
                     if product.alert_price is not None and not product.alert_triggered:
                         if current_price <= product.alert_price:
-                            logger.info(f"Alert triggered for '{product.name}'! Price {current_price} <= target {product.alert_price}")
-                            product.alert_triggered = True
+                            logger.debug(f"Alert triggered for '{product.name}'! Price {current_price} <= target {product.alert_price}")
                             alert_count += 1
-                    
+
+                    product_updates.append({
+                        "_id": product.id,
+                        "p": current_price,
+                        "t": now,
+                        "s": is_on_sale,
+                        "op": original_price,
+                        "e": details.get("etag"),
+                        "lm": details.get("last_modified")
+                    })
                     checked_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error checking product {product.id} ({product.name}): {str(e)}", exc_info=True)
-                    error_count += 1
-                    # Continue with next product even if one fails
-                    continue
-            
-            # Commit all changes
-            await db.commit()
+
+                if product_updates:
+                    await db.execute(update_stmt, product_updates)
+                if touched_ids:
+                    # Timestamp-only refresh for 304 hits: one set-based
+                    # UPDATE instead of a statement per row
+                    await db.execute(
+                        update(Product)
+                        .where(Product.id.in_(touched_ids))
+                        .values(last_check_time=now)
+                    )
+                if history_rows:
+                    await db.execute(PriceHistory.__table__.insert(), history_rows)
+
+                # Commit per batch so the session stays small between pages
+                await db.commit()
+
             logger.info(f"Price check completed: {checked_count} checked, {updated_count} updated, {alert_count} alerts triggered, {error_count} errors")
-            
+
         except Exception as e:
             logger.error(f"Critical error in price check job: {str(e)}", exc_info=True)
             await db.rollback()
@@ -1,11 +1,15 @@
-"""Web scraping service using BeautifulSoup and httpx."""
+"""Web scraping service using lxml and httpx."""
 
 import logging
 import re
 import asyncio
 import random
+import threading
+from functools import lru_cache
 from typing import Optional
-from bs4 import BeautifulSoup
+from urllib.parse import quote_plus, urlsplit, urlunsplit
+from cachetools import TTLCache
+from lxml import etree, html as lxml_html
 import httpx
 from core.config import settings
 from api.schemas import SearchResultItem
@@ -13,13 +17,178 @@ from api.schemas import SearchResultItem
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Precompiled XPath expressions for product-page extraction. Compiling
+# once at import keeps each field lookup a single C-level traversal
+# instead of a Python-level soup.find() walk per candidate selector.
+_H1_XPATH = etree.XPath("(//h1)[1]")
+
+# Price parsing: one precompiled pattern plus one translate pass instead
+# of a chain of str.replace calls; the regex only matches the digit run,
+# so currency tokens like 'Kč'/'CZK' are ignored without being stripped
+_PRICE_RE = re.compile(r'(\d+(?:\.\d+)?)')
+# Strips the thousand separators seen on Czech/Polish shops: comma,
+# regular space, NBSP, narrow NBSP and thin space
+_PRICE_STRIP = str.maketrans('', '', ', \u00a0\u202f\u2009')
+
+# One compiled scan over a badge's text instead of lower() plus a
+# substring probe per sale word
+_SALE_WORDS_CZ_RE = re.compile(r'sale|sleva|akce|discount|ak\u010dn\u00ed', re.IGNORECASE)
+_SALE_WORDS_PL_RE = re.compile(r'sale|promocja|obni\u017cka|discount', re.IGNORECASE)
+
+# Alza.cz selectors, ordered from most to least specific
+_ALZA_PRICE_XPATHS = (
+    etree.XPath("(//*[contains(concat(' ', normalize-space(@class), ' '), ' price-box__price ')])[1]"),
+    etree.XPath("(//*[contains(concat(' ', normalize-space(@class), ' '), ' price ')])[1]"),
+    etree.XPath("(//*[contains(@class, 'price')])[1]"),
+)
+_ALZA_OLD_PRICE_XPATH = etree.XPath("//*[contains(@class, 'old-price')] | //del | //s")
+_ALZA_SALE_XPATH = etree.XPath("//*[contains(@class, 'sale') or contains(@class, 'akce')]")
+
+# Smarty.cz selectors
+_SMARTY_PRICE_XPATHS = (
+    etree.XPath("(//*[contains(concat(' ', normalize-space(@class), ' '), ' price-final ')])[1]"),
+    etree.XPath("(//*[contains(concat(' ', normalize-space(@class), ' '), ' price-current ')])[1]"),
+    etree.XPath("(//*[contains(concat(' ', normalize-space(@class), ' '), ' product-price ')])[1]"),
+    etree.XPath("(//*[contains(@class, 'price')])[1]"),
+)
+_SMARTY_OLD_PRICE_XPATH = etree.XPath(
+    "//*[contains(@class, 'price-old') or contains(@class, 'price-original') or contains(@class, 'old-price')] | //del | //s"
+)
+_SMARTY_SALE_XPATH = etree.XPath("//*[contains(@class, 'sale') or contains(@class, 'sleva')]")
+
+# Allegro.pl selectors
+_ALLEGRO_PRICE_XPATHS = (
+    etree.XPath("(//*[@data-role='price'])[1]"),
+    etree.XPath("(//*[contains(@class, 'price')])[1]"),
+)
+_ALLEGRO_META_PRICE_XPATH = etree.XPath("string((//meta[@property='product:price:amount']/@content)[1])")
+_ALLEGRO_OLD_PRICE_XPATH = etree.XPath(
+    "//*[@data-role='old-price'] | //*[contains(@class, 'price-old') or contains(@class, 'old-price')] | //del | //s"
+)
+_ALLEGRO_SALE_XPATH = etree.XPath(
+    "//*[contains(@class, 'badge') or contains(@class, 'promocja') or contains(@class, 'sale')]"
+)
+
+# Allegro.pl listing-page selectors, relative to one offer box
+_ALLEGRO_BOX_NAME_XPATH = etree.XPath("(.//a[contains(@class, 'name')] | .//h2//a | .//h3//a)[1]")
+_ALLEGRO_BOX_PRICE_XPATHS = (
+    etree.XPath("(.//*[@data-role='price'])[1]"),
+    etree.XPath("(.//*[contains(@class, 'price')])[1]"),
+)
+_ALLEGRO_BOX_IMG_XPATH = etree.XPath("(.//img)[1]")
+_ALLEGRO_BOX_OLD_PRICE_XPATH = etree.XPath(
+    "(.//*[@data-role='old-price'] | .//*[contains(@class, 'price-old')] | .//del)[1]"
+)
+_ALLEGRO_BOX_BADGE_XPATH = etree.XPath(
+    "(.//*[contains(@class, 'badge') or contains(@class, 'promocja')])[1]"
+)
+
+# Feed size for the pull parser; big enough to amortize feed() overhead,
+# small enough to stop tokenizing soon after the limit is reached
+_PULL_PARSER_CHUNK = 65536
+
+
+# One HTML parser per thread: reusing it keeps libxml2's tokenizer
+# buffers warm across pages instead of reallocating them per parse, and
+# remove_blank_text keeps whitespace-only text nodes out of the tree
+_tls = threading.local()
+
+
+def _html_parser() -> lxml_html.HTMLParser:
+    parser = getattr(_tls, 'parser', None)
+    if parser is None:
+        parser = lxml_html.HTMLParser(recover=True, remove_blank_text=True)
+        _tls.parser = parser
+    return parser
+
+
+def _parse_html(content: bytes):
+    """Parse page bytes with the calling thread's reusable parser."""
+    return lxml_html.fromstring(content, parser=_html_parser())
+
+
+# Offer-box predicates for the streaming listing parsers
+def _is_alza_search_box(elem) -> bool:
+    return 'browsingitem' in (elem.get('class') or '')
+
+
+def _is_smarty_search_box(elem) -> bool:
+    return 'product' in (elem.get('class') or '')
+
+
+def _is_allegro_search_box(elem) -> bool:
+    return elem.tag in ('article', 'div') and (
+        elem.get('data-role') == 'offer' or 'offer' in (elem.get('class') or '')
+    )
+
+# Alza.cz listing-page selectors: one XPath locates the offer boxes, the
+# rest run relative to a single box, so extracting a result is a handful
+# of C-level subtree traversals instead of a cascade of bs4 find() calls
+_ALZA_BOX_NAME_XPATH = etree.XPath(
+    "(.//a[contains(@class, 'name')] | .//*[contains(@class, 'name')]//a)[1]"
+)
+_ALZA_BOX_PRICE_XPATHS = (
+    etree.XPath("(.//*[contains(@class, 'price-box__price')])[1]"),
+    etree.XPath("(.//*[contains(@class, 'price')])[1]"),
+)
+_ALZA_BOX_IMG_XPATH = etree.XPath("(.//img)[1]")
+_ALZA_BOX_OLD_PRICE_XPATH = etree.XPath(
+    "(.//*[contains(@class, 'price-box__old-price')] | .//*[contains(@class, 'old-price')] | .//del | .//s)[1]"
+)
+_ALZA_BOX_SALE_XPATH = etree.XPath(
+    "(.//*[contains(@class, 'sale') or contains(@class, 'akce')])[1]"
+)
+
+# Smarty.cz listing-page selectors, same shape as the Alza set
+_SMARTY_BOX_NAME_XPATH = etree.XPath(
+    "(.//a[contains(@class, 'name')] | .//*[contains(@class, 'product-name')]//a | .//h3//a | .//h2//a)[1]"
+)
+_SMARTY_BOX_PRICE_XPATH = etree.XPath("(.//*[contains(@class, 'price')])[1]")
+_SMARTY_BOX_IMG_XPATH = etree.XPath("(.//img)[1]")
+_SMARTY_BOX_OLD_PRICE_XPATH = etree.XPath(
+    "(.//*[contains(@class, 'old') or contains(@class, 'original')] | .//del | .//s)[1]"
+)
+_SMARTY_BOX_SALE_XPATH = etree.XPath("(.//*[contains(@class, 'sale')])[1]")
+
+# How long fetched details and search results stay servable from memory;
+# repeat lookups within the window skip the network round-trip entirely
+_SCRAPE_CACHE_TTL = 60
+
+
+def _normalize_cache_url(url: str) -> str:
+    """
+    Normalize a product URL into a cache key.
+
+    Lowercases the host, drops the fragment, and strips common tracking
+    parameters so cosmetically different URLs for the same page share one
+    cache entry.
+    """
+    parts = urlsplit(url)
+    query = "&".join(
+        param for param in parts.query.split("&")
+        if param and not param.startswith(("utm_", "fbclid", "gclid"))
+    )
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+
 
 class ScraperService:
-    """Service for scraping e-commerce sites using BeautifulSoup and httpx."""
+    """Service for scraping e-commerce sites using lxml and httpx."""
     
     def __init__(self):
         """Initialize the scraper service."""
         self.client: Optional[httpx.AsyncClient] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        # Short-lived result caches; keyed by normalized URL for details
+        # and by (site, query, limit) for searches
+        self._detail_cache: TTLCache = TTLCache(maxsize=1024, ttl=_SCRAPE_CACHE_TTL)
+        self._search_cache: TTLCache = TTLCache(maxsize=256, ttl=_SCRAPE_CACHE_TTL)
+        # Mock fallbacks, bound once at initialize() when mock mode is on;
+        # the error paths then test one attribute instead of re-reading
+        # settings per call
+        self._detail_fallback = None
+        self._search_fallback = None
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -38,28 +207,133 @@ class ScraperService:
     async def initialize(self):
         """Initialize the HTTP client."""
         logger.info("Initializing HTTP client...")
+        # Shared pool with keep-alive so concurrent fetches reuse warm
+        # TCP+TLS connections instead of handshaking per request
+        limits = httpx.Limits(
+            max_connections=settings.scraper_max_concurrency,
+            max_keepalive_connections=settings.scraper_keepalive_connections,
+            keepalive_expiry=settings.scraper_keepalive_expiry
+        )
         self.client = httpx.AsyncClient(
             headers=self.headers,
             timeout=httpx.Timeout(settings.scraper_timeout / 1000.0),  # Convert ms to seconds
+            limits=limits,
             follow_redirects=True,
-            verify=True
+            verify=True,
+            http2=True
         )
+        # Bounds in-flight requests so bursts queue here instead of
+        # overwhelming the pool or tripping site rate limits
+        self._sem = asyncio.Semaphore(settings.scraper_request_concurrency)
+        if settings.scraper_mock_mode:
+            self._detail_fallback = self._get_mock_product_details
+            self._search_fallback = self._get_mock_search_results
+        else:
+            self._detail_fallback = None
+            self._search_fallback = None
         logger.info("HTTP client initialized successfully")
     
     async def close(self):
         """Close HTTP client."""
         logger.info("Closing HTTP client...")
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            self._worker_task = None
+        # Resolve anything still queued so no caller awaits forever; the
+        # cancelled worker fails its in-flight batch the same way
+        self._fail_pending(RuntimeError("Scraper service is shutting down"))
         if self.client:
             await self.client.aclose()
+        # Drop the closed client so the lazy-init guards re-initialize on
+        # the next fetch instead of using a client that raises
+        self.client = None
+        self._sem = None
         logger.info("HTTP client closed successfully")
+
+    def _fail_pending(self, exc: BaseException):
+        """Fail every submission still sitting in the current queue."""
+        queue, self._queue = self._queue, None
+        if queue is None:
+            return
+        while not queue.empty():
+            _, _, fut = queue.get_nowait()
+            if not fut.done():
+                try:
+                    fut.set_exception(exc)
+                except RuntimeError:
+                    # The future's event loop is already closed; there is
+                    # no caller left to notify
+                    pass
+
+    def _ensure_batch_worker(self):
+        """Start (or restart) the batching worker on the current event loop."""
+        loop = asyncio.get_running_loop()
+        if (
+            self._worker_task is None
+            or self._worker_task.done()
+            or self._worker_task.get_loop() is not loop
+        ):
+            if self._worker_task is not None and not self._worker_task.done():
+                self._worker_task.cancel()
+            # Don't orphan submissions from a previous loop when swapping
+            # in a fresh queue
+            self._fail_pending(RuntimeError("Scraper batch worker restarted"))
+            self._queue = asyncio.Queue()
+            self._worker_task = loop.create_task(self._batch_worker())
+
+    async def _submit(self, func, *args):
+        """
+        Submit a scrape call to the batching queue and await its result.
+
+        Calls arriving within the batch window are dispatched together, so
+        concurrent requests share the per-batch fixed costs instead of each
+        fanning out independently.
+        """
+        self._ensure_batch_worker()
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((func, args, fut))
+        return await fut
+
+    async def _batch_worker(self):
+        """Drain queued scrape calls in small batches and fan them out."""
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                window = settings.scraper_batch_window_ms / 1000.0
+                while len(batch) < settings.scraper_batch_size:
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), window))
+                    except asyncio.TimeoutError:
+                        break
+
+                results = await asyncio.gather(
+                    *(func(*args) for func, args, _ in batch),
+                    return_exceptions=True
+                )
+            except asyncio.CancelledError:
+                # Cancelled mid-batch (close() or a worker restart): fail
+                # the collected futures instead of stranding their callers
+                for _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(RuntimeError("Scraper service is shutting down"))
+                raise
+            for (_, _, fut), result in zip(batch, results):
+                if fut.cancelled():
+                    continue
+                if isinstance(result, BaseException):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
     
-    async def _make_request_with_retry(self, url: str, max_retries: int = 3) -> httpx.Response:
+    async def _make_request_with_retry(self, url: str, max_retries: int = 3, extra_headers: Optional[dict] = None) -> httpx.Response:
         """
         Make an HTTP request with retry logic for better reliability.
         
         Args:
             url: URL to request
             max_retries: Maximum number of retry attempts
+            extra_headers: Additional headers (e.g. conditional GET validators)
             
         Returns:
             httpx.Response: Successful response
@@ -93,7 +367,11 @@ class ScraperService:
                 elif 'allegro.pl' in url:
                     request_headers['Referer'] = 'https://allegro.pl/'
                 
-                response = await self.client.get(url, headers=request_headers)
+                if extra_headers:
+                    request_headers.update(extra_headers)
+                
+                async with self._sem:
+                    response = await self.client.get(url, headers=request_headers)
                 response.raise_for_status()
                 return response
                 
@@ -129,11 +407,10 @@ class ScraperService:
         if not price_text:
             return None
         
-        # Remove common currency symbols and separators
-        cleaned_text = price_text.replace(',', '').replace(' ', '').replace('Kč', '').replace('CZK', '')
+        # Drop separators in a single pass, then pull the digit run
+        cleaned_text = price_text.translate(_PRICE_STRIP)
         
-        # Extract numeric value
-        price_match = re.search(r'([\d]+(?:\.[\d]+)?)', cleaned_text)
+        price_match = _PRICE_RE.search(cleaned_text)
         if price_match:
             try:
                 return float(price_match.group(1))
@@ -141,38 +418,90 @@ class ScraperService:
                 return None
         return None
     
-    async def fetch_product_details(self, url: str) -> dict:
+    async def fetch_product_details(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> dict:
         """
         Fetch product details from a product page URL.
-        
+
         Args:
             url: Product page URL
-            
+            etag: ETag from the previous fetch for a conditional GET
+            last_modified: Last-Modified from the previous fetch
+
         Returns:
-            dict: Dictionary with 'name' and 'price' keys
-            
+            dict: Dictionary with 'name' and 'price' keys, plus fresh
+                'etag'/'last_modified' validators when the server sends
+                them; {'unchanged': True} when the server answers 304
+
         Raises:
             Exception: If product details cannot be extracted
         """
+        cache_key = _normalize_cache_url(url)
+        cached = self._detail_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"Detail cache hit for: {url}")
+            return dict(cached)
+
+        details = await self._submit(self._fetch_product_details, url, etag, last_modified)
+        if not details.get("unchanged"):
+            # Store a private copy so later callers can't mutate the
+            # cached entry through the returned dict
+            self._detail_cache[cache_key] = dict(details)
+        return details
+
+    async def fetch_many(self, urls: list[str], concurrency: int = 5) -> list:
+        """
+        Fetch product details for several URLs concurrently.
+
+        The semaphore bounds how many fetches are in flight at once, so
+        a long URL list hides network latency without opening a
+        connection per entry.
+
+        Args:
+            urls: Product page URLs
+            concurrency: Maximum fetches in flight at once
+
+        Returns:
+            list: Per-URL results in input order; entries are detail
+                dicts, or the raised exception for URLs that failed
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(url: str):
+            async with sem:
+                return await self.fetch_product_details(url)
+
+        return await asyncio.gather(*(fetch_one(u) for u in urls), return_exceptions=True)
+
+    async def _fetch_product_details(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> dict:
+        """Fetch and extract product details (runs inside the batch worker)."""
         logger.info(f"Fetching product details from: {url}")
         if not self.client:
             await self.initialize()
         
-        # Check if the site is supported before making network requests
-        supported_sites = ["alza.cz", "smarty.cz", "allegro.pl"]
-        if not any(site in url.lower() for site in supported_sites):
+        # Resolve the site handler before making network requests
+        host = (urlsplit(url).hostname or "").lower().removeprefix("www.")
+        handler = _DETAIL_DISPATCH.get(host)
+        if handler is None:
             raise ValueError(
                 f"Unsupported e-shop URL: {url}. "
                 f"Currently supported sites: Alza.cz, Smarty.cz, Allegro.pl"
             )
         
+        # Conditional GET: if the page is unchanged the server answers 304
+        # with no body and we skip the parse entirely
+        conditional_headers = {}
+        if etag:
+            conditional_headers["If-None-Match"] = etag
+        if last_modified:
+            conditional_headers["If-Modified-Since"] = last_modified
+        
         try:
             try:
-                response = await self._make_request_with_retry(url)
+                response = await self._make_request_with_retry(url, extra_headers=conditional_headers or None)
             except httpx.ConnectError as e:
                 # If mock mode is enabled, return mock data
-                if settings.scraper_mock_mode:
-                    return self._get_mock_product_details(url)
+                if self._detail_fallback is not None:
+                    return self._detail_fallback(url)
                 raise ValueError(
                     f"Cannot reach the website at {url}. "
                     "Please check your internet connection or try again later. "
@@ -185,67 +514,63 @@ class ScraperService:
                     "Please try again in a few moments."
                 )
             except httpx.HTTPStatusError as e:
-                if settings.scraper_mock_mode:
-                    return self._get_mock_product_details(url)
+                if self._detail_fallback is not None:
+                    return self._detail_fallback(url)
                 raise ValueError(f"Unable to load product page: HTTP {e.response.status_code}")
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            if response.status_code == 304:
+                logger.debug(f"Page unchanged (304) for: {url}")
+                return {"unchanged": True}
             
-            # Detect site and extract accordingly
-            if "alza.cz" in url:
-                return await self._fetch_alza_product_details(soup)
-            elif "smarty.cz" in url:
-                return await self._fetch_smarty_product_details(soup)
-            elif "allegro.pl" in url:
-                return await self._fetch_allegro_product_details(soup)
-            else:
-                raise ValueError(
-                    f"Unsupported e-shop URL: {url}. "
-                    f"Currently supported sites: Alza.cz, Smarty.cz, Allegro.pl"
-                )
+            # Parsing is the CPU-heavy stage of a fetch; push it onto the
+            # default thread executor so the scheduler's concurrent batch
+            # doesn't stall the event loop while pages are parsed. The raw
+            # bytes go straight to lxml, which sniffs the charset in C -
+            # no intermediate response.text decode pass
+            tree = await asyncio.to_thread(_parse_html, response.content)
+            
+            details = await handler(self, tree)
+            
+            # Carry the fresh validators so the next check can be conditional
+            details["etag"] = response.headers.get("ETag")
+            details["last_modified"] = response.headers.get("Last-Modified")
+            return details
         except ValueError:
             raise
         except Exception as e:
             logger.error(f"Unexpected error fetching product details: {e}")
             raise ValueError(f"Unable to fetch product details: {str(e)}")
     
-    async def _fetch_alza_product_details(self, soup: BeautifulSoup) -> dict:
+    async def _fetch_alza_product_details(self, tree) -> dict:
         """
         Extract product details from Alza.cz product page.
         
         Args:
-            soup: BeautifulSoup parsed page
+            tree: lxml-parsed page tree
             
         Returns:
             dict: Dictionary with 'name', 'price', 'is_on_sale', and 'original_price' keys
         """
         # Extract product name
-        name_element = soup.find("h1")
-        if not name_element:
+        name_nodes = _H1_XPATH(tree)
+        if not name_nodes:
             raise ValueError(
                 "The product page did not load correctly. "
                 "This might be because the page structure has changed or the product is no longer available. "
                 "Please verify the URL and try again."
             )
-        name = name_element.get_text(strip=True)
+        name = name_nodes[0].text_content().strip()
         
         # Initialize sale status
         is_on_sale = False
         original_price = None
         
-        # Extract price - try multiple selectors
+        # Extract price - try the precompiled selectors in order
         price = None
-        price_selectors = [
-            {"class_": "price-box__price"},
-            {"class_": "price"},
-            {"class_": lambda x: x and 'price' in x}
-        ]
-        
-        for selector in price_selectors:
-            price_element = soup.find(attrs=selector)
-            if price_element:
-                price_text = price_element.get_text(strip=True)
-                price = self._extract_price_from_text(price_text)
+        for price_xpath in _ALZA_PRICE_XPATHS:
+            nodes = price_xpath(tree)
+            if nodes:
+                price = self._extract_price_from_text(''.join(nodes[0].itertext()).strip())
                 if price:
                     break
         
@@ -258,38 +583,19 @@ class ScraperService:
         
         # Check for sale/discount indicators
         # Look for crossed-out original price
-        strikethrough_selectors = [
-            soup.find(class_="price-box__old-price"),
-            soup.find(class_="old-price"),
-            soup.find(class_=lambda x: x and 'old-price' in x),
-            soup.find("del"),
-            soup.find("s")
-        ]
-        
-        for old_price_element in strikethrough_selectors:
-            if old_price_element:
-                old_price_text = old_price_element.get_text(strip=True)
-                original_price = self._extract_price_from_text(old_price_text)
-                if original_price:
-                    is_on_sale = True
-                    break
+        for old_price_element in _ALZA_OLD_PRICE_XPATH(tree):
+            original_price = self._extract_price_from_text(old_price_element.text_content().strip())
+            if original_price:
+                is_on_sale = True
+                break
         
         # If no strikethrough price found, check for sale badges/labels
         if not is_on_sale:
-            sale_indicators = [
-                soup.find(class_="badge-sale"),
-                soup.find(class_="sale-badge"),
-                soup.find(class_=lambda x: x and 'sale' in x),
-                soup.find(class_=lambda x: x and 'akce' in x)
-            ]
-            
-            for sale_element in sale_indicators:
-                if sale_element:
-                    sale_text = sale_element.get_text(strip=True).lower()
-                    # Check if text contains sale indicators
-                    if any(word in sale_text for word in ['sale', 'sleva', 'akce', 'discount', 'akční']):
-                        is_on_sale = True
-                        break
+            for sale_element in _ALZA_SALE_XPATH(tree):
+                # Check if text contains sale indicators
+                if _SALE_WORDS_CZ_RE.search(sale_element.text_content()):
+                    is_on_sale = True
+                    break
         
         logger.info(f"Successfully fetched product: {name}")
         return {
@@ -299,43 +605,35 @@ class ScraperService:
             "original_price": original_price
         }
     
-    async def _fetch_smarty_product_details(self, soup: BeautifulSoup) -> dict:
+    async def _fetch_smarty_product_details(self, tree) -> dict:
         """
         Extract product details from Smarty.cz product page.
         
         Args:
-            soup: BeautifulSoup parsed page
+            tree: lxml-parsed page tree
             
         Returns:
             dict: Dictionary with 'name', 'price', 'is_on_sale', and 'original_price' keys
         """
         # Extract product name
-        name_element = soup.find("h1")
-        if not name_element:
+        name_nodes = _H1_XPATH(tree)
+        if not name_nodes:
             raise ValueError(
                 "The Smarty.cz product page did not load correctly. "
                 "Please verify the URL and try again."
             )
-        name = name_element.get_text(strip=True)
+        name = name_nodes[0].text_content().strip()
         
         # Initialize sale status
         is_on_sale = False
         original_price = None
         
-        # Extract price - try multiple selectors for Smarty
+        # Extract price - try the precompiled selectors in order
         price = None
-        price_selectors = [
-            {"class_": "price-final"},
-            {"class_": "price-current"},
-            {"class_": "product-price"},
-            {"class_": lambda x: x and 'price' in x}
-        ]
-        
-        for selector in price_selectors:
-            price_element = soup.find(attrs=selector)
-            if price_element:
-                price_text = price_element.get_text(strip=True)
-                price = self._extract_price_from_text(price_text)
+        for price_xpath in _SMARTY_PRICE_XPATHS:
+            nodes = price_xpath(tree)
+            if nodes:
+                price = self._extract_price_from_text(''.join(nodes[0].itertext()).strip())
                 if price:
                     break
         
@@ -346,37 +644,18 @@ class ScraperService:
             )
         
         # Check for sale/discount indicators
-        strikethrough_selectors = [
-            soup.find(class_="price-old"),
-            soup.find(class_="price-original"),
-            soup.find(class_=lambda x: x and 'old-price' in x),
-            soup.find("del"),
-            soup.find("s")
-        ]
-        
-        for old_price_element in strikethrough_selectors:
-            if old_price_element:
-                old_price_text = old_price_element.get_text(strip=True)
-                original_price = self._extract_price_from_text(old_price_text)
-                if original_price:
-                    is_on_sale = True
-                    break
+        for old_price_element in _SMARTY_OLD_PRICE_XPATH(tree):
+            original_price = self._extract_price_from_text(old_price_element.text_content().strip())
+            if original_price:
+                is_on_sale = True
+                break
         
         # Check for sale badges
         if not is_on_sale:
-            sale_indicators = [
-                soup.find(class_="badge-sale"),
-                soup.find(class_="label-sale"),
-                soup.find(class_=lambda x: x and 'sale' in x),
-                soup.find(class_=lambda x: x and 'sleva' in x)
-            ]
-            
-            for sale_element in sale_indicators:
-                if sale_element:
-                    sale_text = sale_element.get_text(strip=True).lower()
-                    if any(word in sale_text for word in ['sale', 'sleva', 'akce', 'discount', 'akční']):
-                        is_on_sale = True
-                        break
+            for sale_element in _SMARTY_SALE_XPATH(tree):
+                if _SALE_WORDS_CZ_RE.search(sale_element.text_content()):
+                    is_on_sale = True
+                    break
         
         logger.info(f"Successfully fetched product: {name}")
         return {
@@ -386,51 +665,41 @@ class ScraperService:
             "original_price": original_price
         }
     
-    async def _fetch_allegro_product_details(self, soup: BeautifulSoup) -> dict:
+    async def _fetch_allegro_product_details(self, tree) -> dict:
         """
         Extract product details from Allegro.pl product page.
         
         Args:
-            soup: BeautifulSoup parsed page
+            tree: lxml-parsed page tree
             
         Returns:
             dict: Dictionary with 'name', 'price', 'is_on_sale', and 'original_price' keys
         """
         # Extract product name
-        name_element = soup.find("h1")
-        if not name_element:
+        name_nodes = _H1_XPATH(tree)
+        if not name_nodes:
             raise ValueError(
                 "The Allegro.pl product page did not load correctly. "
                 "Please verify the URL and try again."
             )
-        name = name_element.get_text(strip=True)
+        name = name_nodes[0].text_content().strip()
         
         # Initialize sale status
         is_on_sale = False
         original_price = None
         
-        # Extract price - Allegro uses specific selectors
+        # Extract price - element selectors first, then the OpenGraph meta
         price = None
-        price_selectors = [
-            {"attrs": {"data-role": "price"}},
-            {"class_": lambda x: x and 'price' in x},
-            {"name": "meta", "property": "product:price:amount"}
-        ]
-        
-        for selector in price_selectors:
-            if "name" in selector:
-                price_element = soup.find(**selector)
-                if price_element and price_element.get("content"):
-                    price = self._extract_price_from_text(price_element.get("content"))
-                    if price:
-                        break
-            else:
-                price_element = soup.find(**selector)
-                if price_element:
-                    price_text = price_element.get_text(strip=True)
-                    price = self._extract_price_from_text(price_text)
-                    if price:
-                        break
+        for price_xpath in _ALLEGRO_PRICE_XPATHS:
+            nodes = price_xpath(tree)
+            if nodes:
+                price = self._extract_price_from_text(''.join(nodes[0].itertext()).strip())
+                if price:
+                    break
+        if price is None:
+            meta_content = _ALLEGRO_META_PRICE_XPATH(tree)
+            if meta_content:
+                price = self._extract_price_from_text(meta_content)
         
         if price is None:
             raise ValueError(
@@ -439,36 +708,18 @@ class ScraperService:
             )
         
         # Check for sale/discount indicators
-        strikethrough_selectors = [
-            soup.find(attrs={"data-role": "old-price"}),
-            soup.find(class_="price-old"),
-            soup.find(class_=lambda x: x and 'old-price' in x),
-            soup.find("del"),
-            soup.find("s")
-        ]
-        
-        for old_price_element in strikethrough_selectors:
-            if old_price_element:
-                old_price_text = old_price_element.get_text(strip=True)
-                original_price = self._extract_price_from_text(old_price_text)
-                if original_price:
-                    is_on_sale = True
-                    break
+        for old_price_element in _ALLEGRO_OLD_PRICE_XPATH(tree):
+            original_price = self._extract_price_from_text(old_price_element.text_content().strip())
+            if original_price:
+                is_on_sale = True
+                break
         
         # Check for sale badges
         if not is_on_sale:
-            sale_indicators = [
-                soup.find(class_=lambda x: x and 'badge' in x),
-                soup.find(class_=lambda x: x and 'promocja' in x),
-                soup.find(class_=lambda x: x and 'sale' in x)
-            ]
-            
-            for sale_element in sale_indicators:
-                if sale_element:
-                    sale_text = sale_element.get_text(strip=True).lower()
-                    if any(word in sale_text for word in ['sale', 'promocja', 'obniżka', 'discount']):
-                        is_on_sale = True
-                        break
+            for sale_element in _ALLEGRO_SALE_XPATH(tree):
+                if _SALE_WORDS_PL_RE.search(sale_element.text_content()):
+                    is_on_sale = True
+                    break
         
         logger.info(f"Successfully fetched product: {name}")
         return {
@@ -493,32 +744,71 @@ class ScraperService:
         Raises:
             ValueError: If site is not supported
         """
+        cache_key = (site.lower(), query, limit)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"Search cache hit for '{query}' on {site}")
+            return list(cached)
+
+        results = await self._submit(self._search_site, site, query, limit)
+        self._search_cache[cache_key] = list(results)
+        return results
+
+    async def _search_site(self, site: str, query: str, limit: int = 10) -> list[SearchResultItem]:
+        """Dispatch a site search (runs inside the batch worker)."""
         logger.info(f"Searching {site} for '{query}' (limit: {limit})")
         if not self.client:
             await self.initialize()
         
-        site_lower = site.lower()
-        
-        if site_lower not in ["alza", "smarty", "allegro"]:
+        handler = _SEARCH_DISPATCH.get(site.lower())
+        if handler is None:
             raise ValueError(
                 f"Unsupported site: {site}. "
                 f"Supported sites: alza, smarty, allegro"
             )
         
         try:
-            if site_lower == "alza":
-                return await self._search_alza(query, limit)
-            elif site_lower == "smarty":
-                return await self._search_smarty(query, limit)
-            elif site_lower == "allegro":
-                return await self._search_allegro(query, limit)
+            return await handler(self, query, limit)
         except Exception as e:
             # If mock mode is enabled, return mock data instead of failing
-            if settings.scraper_mock_mode:
+            if self._search_fallback is not None:
                 logger.info(f"Using mock data for query '{query}': {e}")
-                return self._get_mock_search_results(query, limit)
+                return self._search_fallback(query, limit)
             raise
     
+    async def search_all_sites(self, query: str, limit: int = 10) -> list[SearchResultItem]:
+        """
+        Search every supported site concurrently and merge the results.
+
+        Args:
+            query: Search query
+            limit: Maximum number of results per site
+
+        Returns:
+            list[SearchResultItem]: Merged results from all sites that
+                answered; sites that failed are logged and skipped
+        """
+        logger.info(f"Searching all sites for '{query}' (limit: {limit})")
+        if not self.client:
+            await self.initialize()
+
+        # Independent I/O waits overlap, so wall clock is the slowest site
+        # rather than the sum of all three
+        site_searches = {
+            "alza": self._search_alza(query, limit),
+            "smarty": self._search_smarty(query, limit),
+            "allegro": self._search_allegro(query, limit),
+        }
+        outcomes = await asyncio.gather(*site_searches.values(), return_exceptions=True)
+
+        results: list[SearchResultItem] = []
+        for site, outcome in zip(site_searches, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning(f"Search on {site} failed for '{query}': {outcome}")
+                continue
+            results.extend(outcome)
+        return results
+
     async def _search_alza(self, query: str, limit: int = 10) -> list[SearchResultItem]:
         """
         Search Alza.cz for products.
@@ -532,12 +822,12 @@ class ScraperService:
         """
         try:
             # Build search URL
-            search_url = f"https://www.alza.cz/search.htm?extext={query.replace(' ', '+')}"
+            search_url = _alza_search_url(query)
             response = await self._make_request_with_retry(search_url)
         except httpx.ConnectError:
-            if settings.scraper_mock_mode:
+            if self._search_fallback is not None:
                 logger.info("Network error for Alza.cz, using mock data (mock mode enabled)")
-                return self._get_mock_search_results(query, limit)
+                return self._search_fallback(query, limit)
             raise ValueError(
                 "Cannot connect to Alza.cz. "
                 "Please check your internet connection and try again."
@@ -548,83 +838,126 @@ class ScraperService:
                 "Please try again in a few moments."
             )
         except httpx.HTTPStatusError as e:
-            if settings.scraper_mock_mode:
+            if self._search_fallback is not None:
                 logger.info(f"HTTP error for Alza.cz (status {e.response.status_code}), using mock data (mock mode enabled)")
-                return self._get_mock_search_results(query, limit)
+                return self._search_fallback(query, limit)
             raise ValueError(f"Failed to access Alza.cz: HTTP {e.response.status_code}")
         
-        soup = BeautifulSoup(response.text, 'lxml')
+        # Parse + extraction is the CPU phase of a search; running it as
+        # one hop on the default thread executor keeps the event loop free
+        # for the other in-flight fetches while this page is processed
+        results = await asyncio.to_thread(self._parse_alza_search, response.content, limit)
+        logger.info(f"Found {len(results)} results for '{query}'")
+        return results
+
+    def _pull_parse_rows(self, content: bytes, limit: int, is_box, extract) -> list[tuple]:
+        """
+        Stream offer boxes out of listing bytes, stopping at limit.
+
+        Feeds the raw page through lxml's pull parser chunk by chunk and
+        hands each completed box to the extractor, so tokenizing stops as
+        soon as enough rows are collected and processed subtrees are freed
+        instead of accumulating into a full document tree.
+        """
+        parser = etree.HTMLPullParser(events=('end',), recover=True)
+        rows = []
+
+        def consume_events() -> bool:
+            """Process pending events; True once enough rows are collected."""
+            for _, elem in parser.read_events():
+                if len(rows) >= limit:
+                    return True
+                if not is_box(elem):
+                    continue
+                row = extract(elem)
+                if row is not None:
+                    rows.append(row)
+                    # Only drop subtrees we actually consumed; clearing a
+                    # false-positive inner match would gut its parent box
+                    elem.clear()
+            return len(rows) >= limit
+
+        for start in range(0, len(content), _PULL_PARSER_CHUNK):
+            parser.feed(content[start:start + _PULL_PARSER_CHUNK])
+            if consume_events():
+                return rows
+        # Tell the parser the document is over so boxes still open when
+        # the bytes ended (truncated responses) are emitted, not dropped
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        consume_events()
+        return rows
+
+    def _parse_alza_search(self, content: bytes, limit: int) -> list[SearchResultItem]:
+        """Parse an Alza.cz listing page into results (runs in a worker thread)."""
+        try:
+            rows = self._pull_parse_rows(content, limit, _is_alza_search_box, self._extract_alza_search_box)
+        except Exception as e:
+            # One log for the whole page: a failure here means the listing
+            # DOM changed, which per-box absorption used to hide
+            logger.warning(f"Alza.cz listing parse failed: {e}")
+            return []
         
-        # Get all product boxes
-        product_boxes = soup.find_all(class_=['box browsingitem', 'browsingitem'])
-        if not product_boxes:
-            # Try alternative selector
-            product_boxes = soup.find_all('div', class_=lambda x: x and 'browsingitem' in x)
+        return _rows_to_items(rows)
+    
+    def _extract_alza_search_box(self, box) -> Optional[tuple]:
+        """
+        Extract one search result row from an Alza.cz offer box element.
         
-        results = []
-        for box in product_boxes[:limit]:
-            try:
-                # Extract product name
-                name_element = box.find('a', class_='name') or box.find(class_='name').find('a') if box.find(class_='name') else None
-                if not name_element:
-                    continue
-                name = name_element.get_text(strip=True)
-                
-                # Extract product URL
-                product_url = name_element.get('href')
-                if product_url and not product_url.startswith('http'):
-                    product_url = f"https://www.alza.cz{product_url}"
-                
-                # Extract price
-                price_element = box.find(class_='price-box__price') or box.find(class_='price')
-                if not price_element:
-                    continue
-                price_text = price_element.get_text(strip=True)
-                
-                # Parse price using helper method
-                price = self._extract_price_from_text(price_text)
-                if not price:
-                    continue
-                
-                # Extract image URL
-                image_url = None
-                img_element = box.find('img')
-                if img_element:
-                    image_url = img_element.get('src') or img_element.get('data-src')
-                
-                # Check for sale status
-                is_on_sale = False
-                original_price = None
-                
-                # Look for old/strikethrough price
-                old_price_element = box.find(class_='price-box__old-price') or box.find(class_='old-price') or box.find('del') or box.find('s')
-                if old_price_element:
-                    old_price_text = old_price_element.get_text(strip=True)
-                    original_price = self._extract_price_from_text(old_price_text)
-                    if original_price:
-                        is_on_sale = True
-                
-                # If no strikethrough price, check for sale badge
-                if not is_on_sale:
-                    sale_badge = box.find(class_=lambda x: x and ('sale' in x or 'akce' in x))
-                    if sale_badge:
-                        is_on_sale = True
-                
-                results.append(SearchResultItem(
-                    name=name,
-                    price=price,
-                    product_url=product_url,
-                    image_url=image_url,
-                    is_on_sale=is_on_sale,
-                    original_price=original_price
-                ))
-            except Exception as e:
-                # Skip problematic items
-                logger.debug(f"Error processing product box: {e}")
-                continue
+        Args:
+            box: lxml element for the offer box
+            
+        Returns:
+            tuple: Extracted field row, or None if the box is missing
+                required fields
+        """
+        # Extract product name
+        name_nodes = _ALZA_BOX_NAME_XPATH(box)
+        if not name_nodes:
+            return None
+        name_element = name_nodes[0]
+        name = ''.join(name_element.itertext()).strip()
         
-        logger.info(f"Found {len(results)} results for '{query}'")
-        return results
+        # Extract product URL
+        product_url = _absolute_url("https://www.alza.cz", name_element.get('href'))
+        
+        # Extract price; most-specific selector first
+        price = None
+        for price_xpath in _ALZA_BOX_PRICE_XPATHS:
+            nodes = price_xpath(box)
+            if nodes:
+                price = self._extract_price_from_text(''.join(nodes[0].itertext()).strip())
+                if price:
+                    break
+        if not price:
+            return None
+        
+        # Extract image URL
+        image_url = None
+        img_nodes = _ALZA_BOX_IMG_XPATH(box)
+        if img_nodes:
+            # Materialize the attrib mapping once rather than per lookup
+            img_attrs = img_nodes[0].attrib
+            image_url = img_attrs.get('src') or img_attrs.get('data-src')
+        
+        # Check for sale status
+        is_on_sale = False
+        original_price = None
+        
+        # Look for old/strikethrough price
+        old_price_nodes = _ALZA_BOX_OLD_PRICE_XPATH(box)
+        if old_price_nodes:
+            original_price = self._extract_price_from_text(''.join(old_price_nodes[0].itertext()).strip())
+            if original_price:
+                is_on_sale = True
+        
+        # If no strikethrough price, check for sale badge
+        if not is_on_sale and _ALZA_BOX_SALE_XPATH(box):
+            is_on_sale = True
+        
+        return (name, price, product_url, image_url, is_on_sale, original_price)
     
     async def _search_smarty(self, query: str, limit: int = 10) -> list[SearchResultItem]:
         """
@@ -638,12 +971,12 @@ class ScraperService:
             list[SearchResultItem]: Search results
         """
         try:
-            search_url = f"https://www.smarty.cz/search.html?q={query.replace(' ', '+')}"
+            search_url = _smarty_search_url(query)
             response = await self._make_request_with_retry(search_url)
         except httpx.ConnectError:
-            if settings.scraper_mock_mode:
+            if self._search_fallback is not None:
                 logger.info("Network error for Smarty.cz, using mock data (mock mode enabled)")
-                return self._get_mock_search_results(query, limit)
+                return self._search_fallback(query, limit)
             raise ValueError(
                 "Cannot connect to Smarty.cz. "
                 "Please check your internet connection and try again."
@@ -653,65 +986,69 @@ class ScraperService:
                 "Smarty.cz is not responding. Please try again in a few moments."
             )
         except httpx.HTTPStatusError as e:
-            if settings.scraper_mock_mode:
+            if self._search_fallback is not None:
                 logger.info(f"HTTP error for Smarty.cz (status {e.response.status_code}), using mock data (mock mode enabled)")
-                return self._get_mock_search_results(query, limit)
+                return self._search_fallback(query, limit)
             raise ValueError(f"Failed to access Smarty.cz: HTTP {e.response.status_code}")
         
-        soup = BeautifulSoup(response.text, 'lxml')
-        product_boxes = soup.find_all(class_=lambda x: x and ('product-item' in x or 'product' in x))
-        
-        results = []
-        for box in product_boxes[:limit]:
-            try:
-                name_element = box.find('a', class_=lambda x: x and 'name' in x) or box.find(class_='product-name') or box.find(['h3', 'h2']).find('a') if box.find(['h3', 'h2']) else None
-                if not name_element:
-                    continue
-                name = name_element.get_text(strip=True)
-                
-                product_url = name_element.get('href')
-                if product_url and not product_url.startswith('http'):
-                    product_url = f"https://www.smarty.cz{product_url}"
-                
-                price_element = box.find(class_=lambda x: x and 'price' in x)
-                if not price_element:
-                    continue
-                price = self._extract_price_from_text(price_element.get_text(strip=True))
-                if not price:
-                    continue
-                
-                image_url = None
-                img_element = box.find('img')
-                if img_element:
-                    image_url = img_element.get('src') or img_element.get('data-src')
-                
-                is_on_sale = False
-                original_price = None
-                old_price_element = box.find(class_=lambda x: x and ('old' in x or 'original' in x)) or box.find('del') or box.find('s')
-                if old_price_element:
-                    original_price = self._extract_price_from_text(old_price_element.get_text(strip=True))
-                    if original_price:
-                        is_on_sale = True
-                
-                if not is_on_sale:
-                    sale_badge = box.find(class_=lambda x: x and 'sale' in x)
-                    if sale_badge:
-                        is_on_sale = True
-                
-                results.append(SearchResultItem(
-                    name=name,
-                    price=price,
-                    product_url=product_url,
-                    image_url=image_url,
-                    is_on_sale=is_on_sale,
-                    original_price=original_price
-                ))
-            except Exception as e:
-                logger.debug(f"Error processing product box: {e}")
-                continue
-        
+        results = await asyncio.to_thread(self._parse_smarty_search, response.content, limit)
         logger.info(f"Found {len(results)} results for '{query}'")
         return results
+
+    def _parse_smarty_search(self, content: bytes, limit: int) -> list[SearchResultItem]:
+        """Parse a Smarty.cz listing page into results (runs in a worker thread)."""
+        try:
+            rows = self._pull_parse_rows(content, limit, _is_smarty_search_box, self._extract_smarty_search_box)
+        except Exception as e:
+            logger.warning(f"Smarty.cz listing parse failed: {e}")
+            return []
+        
+        return _rows_to_items(rows)
+    
+    def _extract_smarty_search_box(self, box) -> Optional[tuple]:
+        """
+        Extract one search result row from a Smarty.cz offer box element.
+        
+        Args:
+            box: lxml element for the offer box
+            
+        Returns:
+            tuple: Extracted field row, or None if the box is missing
+                required fields
+        """
+        name_nodes = _SMARTY_BOX_NAME_XPATH(box)
+        if not name_nodes:
+            return None
+        name_element = name_nodes[0]
+        name = ''.join(name_element.itertext()).strip()
+        
+        product_url = _absolute_url("https://www.smarty.cz", name_element.get('href'))
+        
+        price_nodes = _SMARTY_BOX_PRICE_XPATH(box)
+        if not price_nodes:
+            return None
+        price = self._extract_price_from_text(''.join(price_nodes[0].itertext()).strip())
+        if not price:
+            return None
+        
+        image_url = None
+        img_nodes = _SMARTY_BOX_IMG_XPATH(box)
+        if img_nodes:
+            img_attrs = img_nodes[0].attrib
+            image_url = img_attrs.get('src') or img_attrs.get('data-src')
+        
+        is_on_sale = False
+        original_price = None
+        old_price_nodes = _SMARTY_BOX_OLD_PRICE_XPATH(box)
+        if old_price_nodes:
+            original_price = self._extract_price_from_text(''.join(old_price_nodes[0].itertext()).strip())
+            if original_price:
+                is_on_sale = True
+        
+        if not is_on_sale and _SMARTY_BOX_SALE_XPATH(box):
+            is_on_sale = True
+        
+        return (name, price, product_url, image_url, is_on_sale, original_price)
     
     async def _search_allegro(self, query: str, limit: int = 10) -> list[SearchResultItem]:
         """
@@ -725,12 +1062,12 @@ class ScraperService:
             list[SearchResultItem]: Search results
         """
         try:
-            search_url = f"https://allegro.pl/listing?string={query.replace(' ', '+')}"
+            search_url = _allegro_search_url(query)
             response = await self._make_request_with_retry(search_url)
         except httpx.ConnectError:
-            if settings.scraper_mock_mode:
+            if self._search_fallback is not None:
                 logger.info("Network error for Allegro.pl, using mock data (mock mode enabled)")
-                return self._get_mock_search_results(query, limit)
+                return self._search_fallback(query, limit)
             raise ValueError(
                 "Cannot connect to Allegro.pl. "
                 "Please check your internet connection and try again."
@@ -740,91 +1077,94 @@ class ScraperService:
                 "Allegro.pl is not responding. Please try again in a few moments."
             )
         except httpx.HTTPStatusError as e:
-            if settings.scraper_mock_mode:
+            if self._search_fallback is not None:
                 logger.info(f"HTTP error for Allegro.pl (status {e.response.status_code}), using mock data (mock mode enabled)")
-                return self._get_mock_search_results(query, limit)
+                return self._search_fallback(query, limit)
             raise ValueError(f"Failed to access Allegro.pl: HTTP {e.response.status_code}")
         
-        soup = BeautifulSoup(response.text, 'lxml')
-        product_boxes = soup.find_all(['article', 'div'], attrs={"data-role": "offer"})
-        if not product_boxes:
-            product_boxes = soup.find_all(class_=lambda x: x and 'offer' in x)
-        
-        results = []
-        for box in product_boxes[:limit]:
-            try:
-                name_element = box.find('a', class_=lambda x: x and 'name' in x) or box.find(['h2', 'h3']).find('a') if box.find(['h2', 'h3']) else None
-                if not name_element:
-                    continue
-                name = name_element.get_text(strip=True)
-                
-                product_url = name_element.get('href')
-                if product_url and not product_url.startswith('http'):
-                    product_url = f"https://allegro.pl{product_url}"
-                
-                price_element = box.find(attrs={"data-role": "price"}) or box.find(class_=lambda x: x and 'price' in x)
-                if not price_element:
-                    continue
-                price = self._extract_price_from_text(price_element.get_text(strip=True))
-                if not price:
-                    continue
-                
-                image_url = None
-                img_element = box.find('img')
-                if img_element:
-                    image_url = img_element.get('src') or img_element.get('data-src')
-                
-                is_on_sale = False
-                original_price = None
-                old_price_element = box.find(attrs={"data-role": "old-price"}) or box.find(class_='price-old') or box.find('del')
-                if old_price_element:
-                    original_price = self._extract_price_from_text(old_price_element.get_text(strip=True))
-                    if original_price:
-                        is_on_sale = True
-                
-                if not is_on_sale:
-                    sale_badge = box.find(class_=lambda x: x and ('badge' in x or 'promocja' in x))
-                    if sale_badge:
-                        is_on_sale = True
-                
-                results.append(SearchResultItem(
-                    name=name,
-                    price=price,
-                    product_url=product_url,
-                    image_url=image_url,
-                    is_on_sale=is_on_sale,
-                    original_price=original_price
-                ))
-            except Exception as e:
-                logger.debug(f"Error processing product box: {e}")
-                continue
-        
+        results = await asyncio.to_thread(self._parse_allegro_search, response.content, limit)
         logger.info(f"Found {len(results)} results for '{query}'")
         return results
+
+    def _parse_allegro_search(self, content: bytes, limit: int) -> list[SearchResultItem]:
+        """Parse an Allegro.pl listing into results (runs in a worker thread).
+
+        Incremental parse straight from the response bytes: offer boxes
+        are emitted as soon as their closing tag is seen, and tokenizing
+        stops once `limit` results are collected instead of building the
+        whole listing tree (or an intermediate decoded str) first.
+        """
+        try:
+            rows = self._pull_parse_rows(content, limit, _is_allegro_search_box, self._extract_allegro_search_box)
+        except Exception as e:
+            logger.warning(f"Allegro.pl listing parse failed: {e}")
+            return []
+        
+        return _rows_to_items(rows)
     
+    def _extract_allegro_search_box(self, box) -> Optional[tuple]:
+        """
+        Extract one search result row from an Allegro offer box element.
+        
+        Args:
+            box: lxml element for the offer box
+            
+        Returns:
+            tuple: Extracted field row, or None if the box is missing
+                required fields
+        """
+        name_nodes = _ALLEGRO_BOX_NAME_XPATH(box)
+        if not name_nodes:
+            return None
+        name_element = name_nodes[0]
+        name = ''.join(name_element.itertext()).strip()
+        
+        product_url = _absolute_url("https://allegro.pl", name_element.get('href'))
+        
+        price = None
+        for price_xpath in _ALLEGRO_BOX_PRICE_XPATHS:
+            nodes = price_xpath(box)
+            if nodes:
+                price = self._extract_price_from_text(''.join(nodes[0].itertext()).strip())
+                if price:
+                    break
+        if not price:
+            return None
+        
+        image_url = None
+        img_nodes = _ALLEGRO_BOX_IMG_XPATH(box)
+        if img_nodes:
+            img_attrs = img_nodes[0].attrib
+            image_url = img_attrs.get('src') or img_attrs.get('data-src')
+        
+        is_on_sale = False
+        original_price = None
+        old_price_nodes = _ALLEGRO_BOX_OLD_PRICE_XPATH(box)
+        if old_price_nodes:
+            original_price = self._extract_price_from_text(''.join(old_price_nodes[0].itertext()).strip())
+            if original_price:
+                is_on_sale = True
+        
+        if not is_on_sale and _ALLEGRO_BOX_BADGE_XPATH(box):
+            is_on_sale = True
+        
+        return (name, price, product_url, image_url, is_on_sale, original_price)
     
     def _get_mock_search_results(self, query: str, limit: int = 10) -> list[SearchResultItem]:
         """
         Generate mock search results for testing/demo purposes.
-        
+
+        Mock traffic repeats the same queries, so the items are built
+        once per (query, limit) and only the returned list is fresh.
+
         Args:
             query: Search query
             limit: Maximum number of results
-            
+
         Returns:
             list[SearchResultItem]: Mock search results
         """
-        results = []
-        for i in range(min(5, limit)):
-            results.append(SearchResultItem(
-                name=f"{query.title()} - Product {i+1}",
-                price=999.99 + (i * 100),
-                product_url=f"https://www.alza.cz/mock-product-{i+1}",
-                image_url=f"https://cdn.alza.cz/mock-image-{i+1}.jpg",
-                is_on_sale=(i % 2 == 0),  # Every other product is on sale
-                original_price=(999.99 + (i * 100) + 200) if i % 2 == 0 else None
-            ))
-        return results
+        return list(_mock_search_items(query, limit))
     
     def _get_mock_product_details(self, url: str) -> dict:
         """
@@ -847,19 +1187,100 @@ class ScraperService:
         }
 
 
+# Host -> handler tables so the hot entry points dispatch with a single
+# dict lookup instead of substring scans down an if/elif chain
+_DETAIL_DISPATCH = {
+    "alza.cz": ScraperService._fetch_alza_product_details,
+    "smarty.cz": ScraperService._fetch_smarty_product_details,
+    "allegro.pl": ScraperService._fetch_allegro_product_details,
+}
+
+_SEARCH_DISPATCH = {
+    "alza": ScraperService._search_alza,
+    "smarty": ScraperService._search_smarty,
+    "allegro": ScraperService._search_allegro,
+}
+
+
+# Search URL builders: quote_plus escapes &, ?, # and % that the old
+# space-to-plus replace left to corrupt the URL, and the lru_cache means
+# repeated queries skip the quoting and string build entirely
+@lru_cache(maxsize=1024)
+def _alza_search_url(query: str) -> str:
+    return f"https://www.alza.cz/search.htm?extext={quote_plus(query)}"
+
+
+@lru_cache(maxsize=1024)
+def _smarty_search_url(query: str) -> str:
+    return f"https://www.smarty.cz/search.html?q={quote_plus(query)}"
+
+
+@lru_cache(maxsize=1024)
+def _allegro_search_url(query: str) -> str:
+    return f"https://allegro.pl/listing?string={quote_plus(query)}"
+
+
+def _absolute_url(base: str, path: Optional[str]) -> Optional[str]:
+    """Prefix a site-relative href with the site's base URL."""
+    if path and not path.startswith('http'):
+        return base + path
+    return path
+
+
+@lru_cache(maxsize=128)
+def _mock_search_items(query: str, limit: int) -> tuple[SearchResultItem, ...]:
+    """Build the mock items for a (query, limit) pair once and reuse them."""
+    return tuple(
+        SearchResultItem(
+            name=f"{query.title()} - Product {i+1}",
+            price=999.99 + (i * 100),
+            product_url=f"https://www.alza.cz/mock-product-{i+1}",
+            image_url=f"https://cdn.alza.cz/mock-image-{i+1}.jpg",
+            is_on_sale=(i % 2 == 0),  # Every other product is on sale
+            original_price=(999.99 + (i * 100) + 200) if i % 2 == 0 else None
+        )
+        for i in range(min(5, limit))
+    )
+
+
+def _rows_to_items(rows) -> list[SearchResultItem]:
+    """Assemble extracted row tuples into search results in one pass."""
+    return [
+        SearchResultItem.model_construct(
+            name=name,
+            price=price,
+            product_url=product_url,
+            image_url=image_url,
+            is_on_sale=is_on_sale,
+            original_price=original_price
+        )
+        for name, price, product_url, image_url, is_on_sale, original_price in rows
+    ]
+
+
 # Global scraper service instance
 _scraper_service: Optional[ScraperService] = None
+_init_lock = asyncio.Lock()
 
 
 async def get_scraper_service() -> ScraperService:
     """
     Dependency function to get scraper service.
-    
+
+    Must stay ``async def`` so FastAPI awaits it inline on the event loop
+    instead of dispatching it through the threadpool on every request.
+    The double-checked lock keeps concurrent first requests from each
+    building and initializing their own service; the steady-state path
+    never touches the lock.
+
     Returns:
         ScraperService: Scraper service instance
     """
     global _scraper_service
     if _scraper_service is None:
-        _scraper_service = ScraperService()
-        await _scraper_service.initialize()
+        async with _init_lock:
+            if _scraper_service is None:
+                service = ScraperService()
+                await service.initialize()
+                _scraper_service = service
     return _scraper_service
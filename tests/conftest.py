@@ -49,7 +49,7 @@ class MockScraperService:
         """Mock close."""
         pass
     
-    async def fetch_product_details(self, url: str) -> dict:
+    async def fetch_product_details(self, url: str, etag=None, last_modified=None) -> dict:
         """Mock fetch product details."""
         # Return different data based on URL for testing
         if "on-sale" in url:
@@ -88,6 +88,19 @@ def mock_scraper():
     return MockScraperService()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_response_cache():
+    """Clear the track endpoints' TTL response cache between tests.
+
+    Each test gets a fresh in-memory database, so cached responses from a
+    previous test must not leak into the next one.
+    """
+    from api.endpoints.track import _product_cache
+    _product_cache.clear()
+    yield
+    _product_cache.clear()
+
+
 @pytest.fixture(scope="function", autouse=True)
 def enable_mock_mode_for_slow_tests(request):
     """Enable mock mode for tests marked as 'slow' to allow them to run without real network access."""
@@ -1,43 +1,51 @@
 """Unit tests for business logic."""
 
 import pytest
+import pytest_asyncio
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 from scheduler.jobs import check_all_product_prices
-from db.models import Product, PriceHistory
+from db.models import Base, Product, PriceHistory
 
 
-@pytest.mark.asyncio
-async def test_check_all_product_prices_no_products():
-    """Test price check job when no products exist."""
-    
-    # Mock database session
-    mock_db = AsyncMock()
-    mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = []
-    mock_db.execute.return_value = mock_result
-    
-    # Mock scraper service
-    mock_scraper = AsyncMock()
-    
-    with patch('scheduler.jobs.AsyncSessionLocal') as mock_session:
-        mock_session.return_value.__aenter__.return_value = mock_db
-        
-        with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
-            await check_all_product_prices()
-            
-            # Verify database was queried but no scraping occurred
-            mock_db.execute.assert_called_once()
-            mock_scraper.fetch_product_details.assert_not_called()
+@pytest_asyncio.fixture(scope="function")
+async def job_db():
+    """In-memory database wired into the scheduler job.
 
+    The job opens its own session via scheduler.jobs.AsyncSessionLocal, so
+    the fixture patches that factory to point at a shared in-memory SQLite
+    database and yields a session for seeding and assertions.
+    """
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        echo=False,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False}
+    )
 
-@pytest.mark.asyncio
-async def test_check_all_product_prices_unchanged_price():
-    """Test price check job when price hasn't changed."""
-    
-    # Create mock product
-    mock_product = Product(
-        id=1,
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
+    with patch('scheduler.jobs.AsyncSessionLocal', session_factory):
+        session = session_factory()
+        yield session
+        await session.close()
+
+    await engine.dispose()
+
+
+def make_product(**overrides) -> Product:
+    """Build a tracked product with sensible defaults."""
+    defaults = dict(
         url="https://www.alza.cz/test",
         name="Test Product",
         eshop="alza",
@@ -45,14 +53,29 @@ async def test_check_all_product_prices_unchanged_price():
         last_check_time=datetime.now(timezone.utc),
         is_tracked=True
     )
-    
-    # Mock database session
-    mock_db = AsyncMock()
-    mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = [mock_product]
-    mock_db.execute.return_value = mock_result
-    
-    # Mock scraper service to return same price
+    defaults.update(overrides)
+    return Product(**defaults)
+
+
+@pytest.mark.asyncio
+async def test_check_all_product_prices_no_products(job_db):
+    """Test price check job when no products exist."""
+    mock_scraper = AsyncMock()
+
+    with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
+        await check_all_product_prices()
+
+    # No products means no scraping at all
+    mock_scraper.fetch_product_details.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_check_all_product_prices_unchanged_price(job_db):
+    """Test price check job when price hasn't changed."""
+    product = make_product()
+    job_db.add(product)
+    await job_db.commit()
+
     mock_scraper = AsyncMock()
     mock_scraper.fetch_product_details.return_value = {
         "name": "Test Product",
@@ -60,51 +83,24 @@ async def test_check_all_product_prices_unchanged_price():
         "is_on_sale": False,
         "original_price": None
     }
-    
-    with patch('scheduler.jobs.AsyncSessionLocal') as mock_session:
-        mock_session.return_value.__aenter__.return_value = mock_db
-        
-        with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
-            await check_all_product_prices()
-            
-            # Verify scraper was called
-            mock_scraper.fetch_product_details.assert_called_once_with(mock_product.url)
-            
-            # Verify no price history was added (price unchanged)
-            # Check that db.add was not called with PriceHistory
-            calls_with_price_history = [
-                call for call in mock_db.add.call_args_list
-                if isinstance(call[0][0], PriceHistory)
-            ]
-            assert len(calls_with_price_history) == 0
-            
-            # Verify commit was called
-            mock_db.commit.assert_called_once()
+
+    with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
+        await check_all_product_prices()
+
+    mock_scraper.fetch_product_details.assert_called_once_with(product.url, etag=None, last_modified=None)
+
+    # Price unchanged: no history row written
+    history = (await job_db.execute(select(PriceHistory))).scalars().all()
+    assert history == []
 
 
 @pytest.mark.asyncio
-async def test_check_all_product_prices_changed_price():
+async def test_check_all_product_prices_changed_price(job_db):
     """Test price check job when price has changed."""
-    
-    # Create mock product
-    mock_product = Product(
-        id=1,
-        url="https://www.alza.cz/test",
-        name="Test Product",
-        eshop="alza",
-        last_known_price=999.99,
-        last_check_time=datetime.now(timezone.utc),
-        is_tracked=True
-    )
-    
-    # Mock database session
-    mock_db = AsyncMock()
-    mock_db.add = MagicMock()  # add() is synchronous in SQLAlchemy
-    mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = [mock_product]
-    mock_db.execute.return_value = mock_result
-    
-    # Mock scraper service to return different price
+    product = make_product()
+    job_db.add(product)
+    await job_db.commit()
+
     mock_scraper = AsyncMock()
     mock_scraper.fetch_product_details.return_value = {
         "name": "Test Product",
@@ -112,105 +108,75 @@ async def test_check_all_product_prices_changed_price():
         "is_on_sale": False,
         "original_price": None
     }
-    
-    with patch('scheduler.jobs.AsyncSessionLocal') as mock_session:
-        mock_session.return_value.__aenter__.return_value = mock_db
-        
-        with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
-            await check_all_product_prices()
-            
-            # Verify scraper was called
-            mock_scraper.fetch_product_details.assert_called_once_with(mock_product.url)
-            
-            # Verify product's last_known_price was updated
-            assert mock_product.last_known_price == 899.99
-            
-            # Verify price history entry was added
-            mock_db.add.assert_called()
-            
-            # Verify commit was called
-            mock_db.commit.assert_called_once()
+
+    with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
+        await check_all_product_prices()
+
+    mock_scraper.fetch_product_details.assert_called_once_with(product.url, etag=None, last_modified=None)
+
+    # The job writes through its own session, so re-read with fresh state
+    product_id = product.id
+    job_db.expire_all()
+
+    # Product's last known price was updated
+    refreshed = (await job_db.execute(
+        select(Product).where(Product.id == product_id)
+    )).scalar_one()
+    assert refreshed.last_known_price == 899.99
+
+    # A price history entry was recorded
+    history = (await job_db.execute(select(PriceHistory))).scalars().all()
+    assert len(history) == 1
+    assert history[0].price == 899.99
+    assert history[0].product_id == product_id
 
 
 @pytest.mark.asyncio
-async def test_check_all_product_prices_handles_errors():
+async def test_check_all_product_prices_handles_errors(job_db):
     """Test price check job handles errors gracefully."""
-    
-    # Create mock products
-    mock_product1 = Product(
-        id=1,
-        url="https://www.alza.cz/test1",
-        name="Test Product 1",
-        eshop="alza",
-        last_known_price=999.99,
-        last_check_time=datetime.now(timezone.utc),
-        is_tracked=True
-    )
-    
-    mock_product2 = Product(
-        id=2,
-        url="https://www.alza.cz/test2",
-        name="Test Product 2",
-        eshop="alza",
-        last_known_price=799.99,
-        last_check_time=datetime.now(timezone.utc),
-        is_tracked=True
-    )
-    
-    # Mock database session
-    mock_db = AsyncMock()
-    mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = [mock_product1, mock_product2]
-    mock_db.execute.return_value = mock_result
-    
-    # Mock scraper service to fail on first product but succeed on second
+    product1 = make_product(url="https://www.alza.cz/test1", name="Test Product 1")
+    product2 = make_product(url="https://www.alza.cz/test2", name="Test Product 2", last_known_price=799.99)
+    job_db.add_all([product1, product2])
+    await job_db.commit()
+
+    # Fail on the first product but succeed on the second; keyed by URL
+    # because fetches run concurrently
+    async def fetch(url, etag=None, last_modified=None):
+        if url.endswith("test1"):
+            raise Exception("Network error")
+        return {"name": "Test Product 2", "price": 699.99, "is_on_sale": False, "original_price": None}
+
     mock_scraper = AsyncMock()
-    mock_scraper.fetch_product_details.side_effect = [
-        Exception("Network error"),  # First call fails
-        {"name": "Test Product 2", "price": 799.99, "is_on_sale": False, "original_price": None}  # Second call succeeds
-    ]
-    
-    with patch('scheduler.jobs.AsyncSessionLocal') as mock_session:
-        mock_session.return_value.__aenter__.return_value = mock_db
-        
-        with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
-            # Should not raise exception
-            await check_all_product_prices()
-            
-            # Verify both products were attempted
-            assert mock_scraper.fetch_product_details.call_count == 2
-            
-            # Verify commit was still called despite error
-            mock_db.commit.assert_called_once()
+    mock_scraper.fetch_product_details.side_effect = fetch
+
+    with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
+        # Should not raise exception
+        await check_all_product_prices()
+
+    # Both products were attempted
+    assert mock_scraper.fetch_product_details.call_count == 2
+
+    id1, id2 = product1.id, product2.id
+    job_db.expire_all()
+
+    # The failing product kept its old price; the good one was updated
+    refreshed1 = (await job_db.execute(
+        select(Product).where(Product.id == id1)
+    )).scalar_one()
+    refreshed2 = (await job_db.execute(
+        select(Product).where(Product.id == id2)
+    )).scalar_one()
+    assert refreshed1.last_known_price == 999.99
+    assert refreshed2.last_known_price == 699.99
 
 
 @pytest.mark.asyncio
-async def test_check_all_product_prices_triggers_alert():
+async def test_check_all_product_prices_triggers_alert(job_db):
     """Test price check job triggers alert when price drops below target."""
-    
-    # Create mock product with alert set
-    mock_product = Product(
-        id=1,
-        url="https://www.alza.cz/test",
-        name="Test Product",
-        eshop="alza",
-        last_known_price=999.99,
-        last_check_time=datetime.now(timezone.utc),
-        is_tracked=True,
-        alert_price=900.0,  # Alert set for 900
-        alert_triggered=False,
-        is_on_sale=False,
-        original_price=None
-    )
-    
-    # Mock database session
-    mock_db = AsyncMock()
-    mock_db.add = MagicMock()  # add() is synchronous in SQLAlchemy
-    mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = [mock_product]
-    mock_db.execute.return_value = mock_result
-    
-    # Mock scraper service to return price below alert threshold
+    product = make_product(alert_price=900.0, alert_triggered=False)
+    job_db.add(product)
+    await job_db.commit()
+
     mock_scraper = AsyncMock()
     mock_scraper.fetch_product_details.return_value = {
         "name": "Test Product",
@@ -218,47 +184,30 @@ async def test_check_all_product_prices_triggers_alert():
         "is_on_sale": False,
         "original_price": None
     }
-    
-    with patch('scheduler.jobs.AsyncSessionLocal') as mock_session:
-        mock_session.return_value.__aenter__.return_value = mock_db
-        
-        with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
-            await check_all_product_prices()
-            
-            # Verify alert was triggered
-            assert mock_product.alert_triggered is True
-            assert mock_product.last_known_price == 850.0
-            
-            # Verify commit was called
-            mock_db.commit.assert_called_once()
+
+    with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
+        await check_all_product_prices()
+
+    product_id = product.id
+    job_db.expire_all()
+    refreshed = (await job_db.execute(
+        select(Product).where(Product.id == product_id)
+    )).scalar_one()
+    assert refreshed.alert_triggered is True
+    assert refreshed.last_known_price == 850.0
 
 
 @pytest.mark.asyncio
-async def test_check_all_product_prices_does_not_retrigger_alert():
+async def test_check_all_product_prices_does_not_retrigger_alert(job_db):
     """Test that alert is not triggered again if already triggered."""
-    
-    # Create mock product with alert already triggered
-    mock_product = Product(
-        id=1,
-        url="https://www.alza.cz/test",
-        name="Test Product",
-        eshop="alza",
+    product = make_product(
         last_known_price=850.0,
-        last_check_time=datetime.now(timezone.utc),
-        is_tracked=True,
         alert_price=900.0,
-        alert_triggered=True,  # Already triggered
-        is_on_sale=False,
-        original_price=None
+        alert_triggered=True  # Already triggered
     )
-    
-    # Mock database session
-    mock_db = AsyncMock()
-    mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = [mock_product]
-    mock_db.execute.return_value = mock_result
-    
-    # Mock scraper service
+    job_db.add(product)
+    await job_db.commit()
+
     mock_scraper = AsyncMock()
     mock_scraper.fetch_product_details.return_value = {
         "name": "Test Product",
@@ -266,42 +215,26 @@ async def test_check_all_product_prices_does_not_retrigger_alert():
         "is_on_sale": False,
         "original_price": None
     }
-    
-    with patch('scheduler.jobs.AsyncSessionLocal') as mock_session:
-        mock_session.return_value.__aenter__.return_value = mock_db
-        
-        with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
-            await check_all_product_prices()
-            
-            # Verify alert_triggered remains True (not changed)
-            assert mock_product.alert_triggered is True
+
+    with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
+        await check_all_product_prices()
+
+    # alert_triggered remains True (not reset, not re-counted)
+    product_id = product.id
+    job_db.expire_all()
+    refreshed = (await job_db.execute(
+        select(Product).where(Product.id == product_id)
+    )).scalar_one()
+    assert refreshed.alert_triggered is True
 
 
 @pytest.mark.asyncio
-async def test_check_all_product_prices_updates_sale_status():
+async def test_check_all_product_prices_updates_sale_status(job_db):
     """Test price check job updates sale status."""
-    
-    # Create mock product not on sale
-    mock_product = Product(
-        id=1,
-        url="https://www.alza.cz/test",
-        name="Test Product",
-        eshop="alza",
-        last_known_price=999.99,
-        last_check_time=datetime.now(timezone.utc),
-        is_tracked=True,
-        is_on_sale=False,
-        original_price=None
-    )
-    
-    # Mock database session
-    mock_db = AsyncMock()
-    mock_db.add = MagicMock()  # add() is synchronous in SQLAlchemy
-    mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = [mock_product]
-    mock_db.execute.return_value = mock_result
-    
-    # Mock scraper service to return product now on sale
+    product = make_product(is_on_sale=False, original_price=None)
+    job_db.add(product)
+    await job_db.commit()
+
     mock_scraper = AsyncMock()
     mock_scraper.fetch_product_details.return_value = {
         "name": "Test Product",
@@ -309,17 +242,15 @@ async def test_check_all_product_prices_updates_sale_status():
         "is_on_sale": True,
         "original_price": 999.99
     }
-    
-    with patch('scheduler.jobs.AsyncSessionLocal') as mock_session:
-        mock_session.return_value.__aenter__.return_value = mock_db
-        
-        with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
-            await check_all_product_prices()
-            
-            # Verify sale status was updated
-            assert mock_product.is_on_sale is True
-            assert mock_product.original_price == 999.99
-            assert mock_product.last_known_price == 799.99
-            
-            # Verify commit was called
-            mock_db.commit.assert_called_once()
+
+    with patch('scheduler.jobs.get_scraper_service', return_value=mock_scraper):
+        await check_all_product_prices()
+
+    product_id = product.id
+    job_db.expire_all()
+    refreshed = (await job_db.execute(
+        select(Product).where(Product.id == product_id)
+    )).scalar_one()
+    assert refreshed.is_on_sale is True
+    assert refreshed.original_price == 999.99
+    assert refreshed.last_known_price == 799.99
@@ -30,6 +30,26 @@ class TestBaseSiteHandler:
         assert BaseSiteHandler._extract_price_from_text("") is None
         assert BaseSiteHandler._extract_price_from_text(None) is None
         assert BaseSiteHandler._extract_price_from_text("no price here") is None
+    
+    @pytest.mark.asyncio
+    async def test_block_heavy_resources(self):
+        """Test that heavy resource types are aborted and others continue."""
+        mock_page = AsyncMock()
+        handler = AlzaHandler(mock_page)
+        
+        await handler.block_heavy_resources()
+        mock_page.route.assert_called_once()
+        
+        # The installed filter aborts images but lets documents through
+        image_route = AsyncMock()
+        image_route.request.resource_type = "image"
+        await handler._route_filter(image_route)
+        image_route.abort.assert_called_once()
+        
+        doc_route = AsyncMock()
+        doc_route.request.resource_type = "document"
+        await handler._route_filter(doc_route)
+        doc_route.continue_.assert_called_once()
 
 
 class TestGetSiteHandler:
@@ -67,68 +87,39 @@ class TestAlzaHandler:
     async def test_extract_product_details_success(self):
         """Test successful product extraction from Alza."""
         mock_page = AsyncMock()
-        
-        # Mock name element
-        mock_name_elem = AsyncMock()
-        mock_name_elem.inner_text = AsyncMock(return_value="Test Product")
-        
-        # Mock price element
-        mock_price_elem = AsyncMock()
-        mock_price_elem.inner_text = AsyncMock(return_value="999 Kč")
-        
-        # Setup page selectors
+
+        # Extraction happens in one page.evaluate returning matched texts
         mock_page.wait_for_selector = AsyncMock()
-        
-        # Use a function to handle multiple calls
-        call_count = [0]
-        async def mock_query_selector(selector):
-            call_count[0] += 1
-            if call_count[0] == 1:  # h1
-                return mock_name_elem
-            elif call_count[0] == 2:  # first price selector fails
-                return None
-            elif call_count[0] == 3:  # second price selector succeeds
-                return mock_price_elem
-            else:  # all other selectors return None
-                return None
-        
-        mock_page.query_selector = mock_query_selector
-        
+        mock_page.evaluate = AsyncMock(return_value={
+            "name": "Test Product",
+            "priceTexts": ["999 Kč"],
+            "oldPriceTexts": [],
+            "onSale": False
+        })
+
         handler = AlzaHandler(mock_page)
         result = await handler.extract_product_details()
-        
+
         assert result["name"] == "Test Product"
         assert result["price"] == 999.0
         assert result["is_on_sale"] is False
         assert result["original_price"] is None
-    
+
     async def test_extract_product_details_on_sale(self):
         """Test extracting product on sale."""
         mock_page = AsyncMock()
-        
-        # Mock name element
-        mock_name_elem = AsyncMock()
-        mock_name_elem.inner_text = AsyncMock(return_value="Sale Product")
-        
-        # Mock price element
-        mock_price_elem = AsyncMock()
-        mock_price_elem.inner_text = AsyncMock(return_value="799 Kč")
-        
-        # Mock old price element
-        mock_old_price_elem = AsyncMock()
-        mock_old_price_elem.inner_text = AsyncMock(return_value="999 Kč")
-        
-        # Setup page selectors
+
         mock_page.wait_for_selector = AsyncMock()
-        mock_page.query_selector = AsyncMock(side_effect=[
-            mock_name_elem,  # h1 selector
-            mock_price_elem,  # price selector
-            mock_old_price_elem,  # old price selector
-        ])
-        
+        mock_page.evaluate = AsyncMock(return_value={
+            "name": "Sale Product",
+            "priceTexts": ["799 Kč"],
+            "oldPriceTexts": ["999 Kč"],
+            "onSale": False
+        })
+
         handler = AlzaHandler(mock_page)
         result = await handler.extract_product_details()
-        
+
         assert result["name"] == "Sale Product"
         assert result["price"] == 799.0
         assert result["is_on_sale"] is True
@@ -149,15 +140,16 @@ class TestAlzaHandler:
     async def test_extract_product_details_no_price(self):
         """Test handling of missing price."""
         mock_page = AsyncMock()
-        
-        # Mock name element
-        mock_name_elem = AsyncMock()
-        mock_name_elem.inner_text = AsyncMock(return_value="Test Product")
-        
-        # Setup page selectors - all price selectors return None
+
+        # No price selector matched anything on the page
         mock_page.wait_for_selector = AsyncMock()
-        mock_page.query_selector = AsyncMock(return_value=None)
-        
+        mock_page.evaluate = AsyncMock(return_value={
+            "name": "Test Product",
+            "priceTexts": [],
+            "oldPriceTexts": [],
+            "onSale": False
+        })
+
         handler = AlzaHandler(mock_page)
         
         with pytest.raises(ValueError, match="Unable to find the product price"):
@@ -171,79 +163,39 @@ class TestSmartyHandler:
     async def test_extract_product_details_success(self):
         """Test successful product extraction from Smarty."""
         mock_page = AsyncMock()
-        
-        # Mock name element
-        mock_name_elem = AsyncMock()
-        mock_name_elem.inner_text = AsyncMock(return_value="Smarty Product")
-        
-        # Mock price element
-        mock_price_elem = AsyncMock()
-        mock_price_elem.inner_text = AsyncMock(return_value="1499 Kč")
-        
-        # Setup page selectors
+
+        # Extraction happens in one page.evaluate returning matched texts
         mock_page.wait_for_selector = AsyncMock()
-        
-        # Use a function to handle multiple calls
-        call_count = [0]
-        async def mock_query_selector(selector):
-            call_count[0] += 1
-            if call_count[0] == 1:  # h1
-                return mock_name_elem
-            elif call_count[0] == 2:  # first price selector fails
-                return None
-            elif call_count[0] == 3:  # second price selector succeeds
-                return mock_price_elem
-            else:  # all other selectors return None
-                return None
-        
-        mock_page.query_selector = mock_query_selector
-        
+        mock_page.evaluate = AsyncMock(return_value={
+            "name": "Smarty Product",
+            "priceTexts": ["1499 Kč"],
+            "oldPriceTexts": [],
+            "onSale": False
+        })
+
         handler = SmartyHandler(mock_page)
         result = await handler.extract_product_details()
-        
+
         assert result["name"] == "Smarty Product"
         assert result["price"] == 1499.0
         assert result["is_on_sale"] is False
         assert result["original_price"] is None
-    
+
     async def test_extract_product_details_with_sale_badge(self):
         """Test product with sale badge."""
         mock_page = AsyncMock()
-        
-        # Mock name element
-        mock_name_elem = AsyncMock()
-        mock_name_elem.inner_text = AsyncMock(return_value="Sale Item")
-        
-        # Mock price element
-        mock_price_elem = AsyncMock()
-        mock_price_elem.inner_text = AsyncMock(return_value="899 Kč")
-        
-        # Mock sale badge
-        mock_sale_badge = AsyncMock()
-        mock_sale_badge.inner_text = AsyncMock(return_value="Akce")
-        
-        # Setup page selectors
+
         mock_page.wait_for_selector = AsyncMock()
-        
-        call_count = [0]
-        async def mock_query_selector(selector):
-            call_count[0] += 1
-            if call_count[0] == 1:  # h1
-                return mock_name_elem
-            elif call_count[0] == 2:  # first price selector
-                return None
-            elif call_count[0] == 3:  # second price selector
-                return mock_price_elem
-            elif call_count[0] == 4:  # old price
-                return None
-            else:  # sale badge
-                return mock_sale_badge
-        
-        mock_page.query_selector = mock_query_selector
-        
+        mock_page.evaluate = AsyncMock(return_value={
+            "name": "Sale Item",
+            "priceTexts": ["899 Kč"],
+            "oldPriceTexts": [],
+            "onSale": True
+        })
+
         handler = SmartyHandler(mock_page)
         result = await handler.extract_product_details()
-        
+
         assert result["name"] == "Sale Item"
         assert result["price"] == 899.0
         assert result["is_on_sale"] is True
@@ -256,72 +208,41 @@ class TestAllegroHandler:
     async def test_extract_product_details_success(self):
         """Test successful product extraction from Allegro."""
         mock_page = AsyncMock()
-        
-        # Mock name element
-        mock_name_elem = AsyncMock()
-        mock_name_elem.inner_text = AsyncMock(return_value="Allegro Product")
-        
-        # Mock price element
-        mock_price_elem = AsyncMock()
-        mock_price_elem.inner_text = AsyncMock(return_value="99.99 zł")
-        
-        # Setup page selectors
+
+        # Extraction happens in one page.evaluate returning matched texts
         mock_page.wait_for_selector = AsyncMock()
-        
-        # Use a function to handle multiple calls
-        call_count = [0]
-        async def mock_query_selector(selector):
-            call_count[0] += 1
-            if call_count[0] == 1:  # h1
-                return mock_name_elem
-            elif call_count[0] == 2:  # first price selector succeeds
-                return mock_price_elem
-            else:  # all other selectors return None
-                return None
-        
-        mock_page.query_selector = mock_query_selector
-        
+        mock_page.evaluate = AsyncMock(return_value={
+            "name": "Allegro Product",
+            "priceTexts": ["99.99 zł"],
+            "oldPriceTexts": [],
+            "onSale": False
+        })
+
         handler = AllegroHandler(mock_page)
         result = await handler.extract_product_details()
-        
+
         assert result["name"] == "Allegro Product"
         assert result["price"] == 99.99
         assert result["is_on_sale"] is False
         assert result["original_price"] is None
-    
+
     async def test_extract_product_details_with_meta_price(self):
         """Test extracting price from meta tag."""
         mock_page = AsyncMock()
-        
-        # Mock name element
-        mock_name_elem = AsyncMock()
-        mock_name_elem.inner_text = AsyncMock(return_value="Meta Price Product")
-        
-        # Mock meta price element
-        mock_meta_elem = AsyncMock()
-        mock_meta_elem.get_attribute = AsyncMock(return_value="199.99")
-        mock_meta_elem.inner_text = AsyncMock(return_value="199.99 zł")  # Add inner_text as fallback
-        
-        # Setup page selectors
+
+        # Only the meta selector matched; the JS returns its content
+        # attribute as the price text
         mock_page.wait_for_selector = AsyncMock()
-        
-        call_count = [0]
-        async def mock_query_selector(selector):
-            call_count[0] += 1
-            if call_count[0] == 1:  # h1
-                return mock_name_elem
-            elif call_count[0] <= 3:  # first price selectors fail
-                return None
-            elif call_count[0] == 4:  # meta/fourth selector succeeds
-                return mock_meta_elem
-            else:  # no sale
-                return None
-        
-        mock_page.query_selector = mock_query_selector
-        
+        mock_page.evaluate = AsyncMock(return_value={
+            "name": "Meta Price Product",
+            "priceTexts": ["199.99"],
+            "oldPriceTexts": [],
+            "onSale": False
+        })
+
         handler = AllegroHandler(mock_page)
         result = await handler.extract_product_details()
-        
+
         assert result["name"] == "Meta Price Product"
         # The price should be extracted either from attribute or text
         assert result["price"] in [199.99, 199]  # Allow some flexibility